@@ -1,6 +1,7 @@
 from pathlib import Path
 
 from .cell_database import CellDatabase
+from .inmemory import InMemoryCellIndex
 from .pgdatabase import PgDatabase
 from . import duplicate_policy
 
@@ -33,7 +33,7 @@ def create_antenna_light_table(con):
                     WHEN radio = '4G' AND cell is NOT NULL THEN cell
                     ELSE NULL
                 END eci,
-                'SRID=4326;POINT('||rdx||' '||rdy||')', azimuth
+                'SRID=28992;POINT('||rdx||' '||rdy||')', azimuth
             FROM antenna
             WHERE cell is NOT NULL OR eci is NOT NULL
         """
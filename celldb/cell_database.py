@@ -46,5 +46,14 @@ class CellDatabase(Iterable[Properties]):
         """
         raise NotImplementedError
 
+    def count(self, *args, **kwargs) -> int:
+        """
+        Counts the antennas matching a `search` with the same arguments.
+
+        Subclasses may override this to count without materializing the
+        matching antennas.
+        """
+        return len(self.search(*args, **kwargs))
+
     def __len__(self):
         raise NotImplementedError
@@ -0,0 +1,191 @@
+import datetime
+import random
+from collections import defaultdict
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from cellsite import CellIdentity
+from cellsite.coord import Point
+from cellsite.properties import Properties
+from . import duplicate_policy
+from .cell_database import CellDatabase
+
+
+class InMemoryCellIndex(CellDatabase):
+    """
+    In-process snapshot of a cell database.
+
+    Loads antennas once and answers subsequent lookups and radius queries
+    with vectorized in-memory computation, so repeated queries against a
+    stable snapshot skip the database entirely.
+    """
+
+    def __init__(self, rows, build_antenna, on_duplicate=duplicate_policy.warn):
+        """
+        :param rows: rows as selected by `SELECT_COLUMNS` in `pgdatabase`
+        :param build_antenna: callable turning one row into a `Properties`
+        :param on_duplicate: policy when finding multiple results for a cell
+        """
+        self._rows = list(rows)
+        self._build_antenna = build_antenna
+        self._on_duplicate = on_duplicate
+        self._antennas = [build_antenna(row) for row in self._rows]
+        self._x = np.array([antenna.wgs84.x for antenna in self._antennas])
+        self._y = np.array([antenna.wgs84.y for antenna in self._antennas])
+        self._by_cell = defaultdict(list)
+        for index, antenna in enumerate(self._antennas):
+            self._by_cell[antenna.cell].append(index)
+
+    def _is_active(self, index: int, date: datetime.datetime) -> bool:
+        date_start, date_end = self._rows[index][0], self._rows[index][1]
+        return (date_start is None or date >= date_start) and (
+            date_end is None or date < date_end
+        )
+
+    def get(self, date: datetime.datetime, ci: CellIdentity) -> Optional[Properties]:
+        if isinstance(date, datetime.date):
+            date = datetime.datetime.combine(date, datetime.datetime.min.time())
+
+        results = [
+            self._antennas[index]
+            for index in self._by_cell.get(ci, ())
+            if self._is_active(index, date)
+        ]
+        if len(results) == 0:
+            return None
+        elif len(results) > 1:
+            return self._on_duplicate(ci, results)
+        else:
+            return results[0]
+
+    def _select(
+        self,
+        coords: Point = None,
+        distance_limit_m: float = None,
+        distance_lower_limit_m: float = None,
+        date: datetime.datetime = None,
+        radio=None,
+        mcc: int = None,
+        mnc: int = None,
+        exclude: Optional[List[CellIdentity]] = None,
+    ):
+        """
+        Applies the `search` filters and returns the matching
+        (position, index) entries along with the distance array, leaving
+        ordering and materialization to the caller.
+        """
+        indexes = np.arange(len(self._antennas))
+        distances = None
+
+        if coords is not None:
+            assert (
+                distance_limit_m is not None
+            ), "search for coords without distance limit"
+            rd = coords.rd()
+            distances = np.hypot(self._x - rd.x, self._y - rd.y)
+            mask = distances <= distance_limit_m
+            if distance_lower_limit_m is not None:
+                mask &= distances >= distance_lower_limit_m
+            indexes = indexes[mask]
+            distances = distances[mask]
+
+        selected = []
+        if radio is not None and isinstance(radio, str):
+            radio = [radio]
+        if exclude is not None and isinstance(exclude, CellIdentity):
+            exclude = [exclude]
+
+        for position, index in enumerate(indexes):
+            cell = self._antennas[index].cell
+            if date is not None and not self._is_active(index, date):
+                continue
+            if radio is not None and cell.radio not in radio:
+                continue
+            if mcc is not None and cell.mcc != mcc:
+                continue
+            if mnc is not None and cell.mnc != mnc:
+                continue
+            if exclude is not None and cell in exclude:
+                continue
+            selected.append((position, index))
+
+        return selected, distances
+
+    def search(
+        self,
+        coords: Point = None,
+        distance_limit_m: float = None,
+        distance_lower_limit_m: float = None,
+        date: datetime.datetime = None,
+        radio=None,
+        mcc: int = None,
+        mnc: int = None,
+        count_limit: Optional[int] = 10000,
+        random_order: bool = False,
+        exclude: Optional[List[CellIdentity]] = None,
+    ) -> CellDatabase:
+        selected, distances = self._select(
+            coords,
+            distance_limit_m,
+            distance_lower_limit_m,
+            date,
+            radio,
+            mcc,
+            mnc,
+            exclude,
+        )
+
+        if random_order:
+            random.shuffle(selected)
+        elif distances is not None:
+            selected.sort(key=lambda entry: distances[entry[0]])
+
+        if count_limit is not None:
+            selected = selected[:count_limit]
+
+        return InMemoryCellIndex(
+            (self._rows[index] for _, index in selected),
+            self._build_antenna,
+            self._on_duplicate,
+        )
+
+    def count(
+        self,
+        coords: Point = None,
+        distance_limit_m: float = None,
+        distance_lower_limit_m: float = None,
+        date: datetime.datetime = None,
+        radio=None,
+        mcc: int = None,
+        mnc: int = None,
+        count_limit: Optional[int] = 10000,
+        random_order: bool = False,
+        exclude: Optional[List[CellIdentity]] = None,
+    ) -> int:
+        # counting skips the construction of a result index
+        selected, _ = self._select(
+            coords,
+            distance_limit_m,
+            distance_lower_limit_m,
+            date,
+            radio,
+            mcc,
+            mnc,
+            exclude,
+        )
+        if count_limit is not None:
+            return min(len(selected), count_limit)
+        return len(selected)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, tb):
+        pass
+
+    def __iter__(self) -> Iterable[Properties]:
+        return iter(self._antennas)
+
+    def __len__(self):
+        return len(self._antennas)
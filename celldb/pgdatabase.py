@@ -1,54 +1,94 @@
 import csv
 import datetime
+import io
+import itertools
 import math
+import struct
 import warnings
-from typing import Optional, List, Iterable, Callable
+from collections import defaultdict
+from functools import lru_cache
+from typing import Optional, List, Iterable, Callable, Dict, Tuple
 
+import numpy as np
+from psycopg2.extras import execute_values
 from tqdm import tqdm
 
 from cellsite.properties import Properties
 from . import duplicate_policy
 from .cell_database import CellDatabase
+from .inmemory import InMemoryCellIndex
 from cellsite import CellIdentity
-from cellsite.cell_identity import CellGlobalIdentity, LTECell
-from cellsite.coord import Point, RdPoint, WgsPoint
+from cellsite.cell_identity import CellGlobalIdentity, GSMCell, LTECell, UMTSCell
+from cellsite.coord import WGS84_TO_RD, Point, RdPoint, WgsPoint
+
+
+# per-radio cell constructors, resolved once instead of branching per row
+_CELL_BUILDERS = {
+    "GSM": lambda mcc, mnc, lac, ci, eci: GSMCell(mcc, mnc, lac, ci),
+    "UMTS": lambda mcc, mnc, lac, ci, eci: UMTSCell(mcc, mnc, lac, ci),
+    "LTE": lambda mcc, mnc, lac, ci, eci: LTECell(mcc, mnc, eci),
+    None: lambda mcc, mnc, lac, ci, eci: CellIdentity.create(
+        None, mcc, mnc, lac, ci=ci, eci=eci
+    ),
+}
+
+
+def _parse_point_wkb(wkb):
+    """
+    Extract x/y from a WKB-encoded point, so the server sends the geometry
+    as-is instead of evaluating ST_X/ST_Y per row.
+    """
+    buf = bytes(wkb)
+    # byte 0: endianness, bytes 1-4: geometry type, then two doubles
+    if buf[0] == 1:
+        return struct.unpack_from("<dd", buf, 5)
+    return struct.unpack_from(">dd", buf, 5)
 
 
 def _build_antenna(row):
-    date_start, date_end, radio, mcc, mnc, lac, ci, eci, rdx, rdy, azimuth_degrees = row
-    if radio == "GSM" or radio == "UMTS":
-        retrieved_ci = CellIdentity.create(radio, mcc, mnc, lac, ci=ci)
-    elif radio == "LTE":
-        retrieved_ci = CellIdentity.create(radio, mcc, mnc, lac, eci=eci)
-    elif radio is None:
-        retrieved_ci = CellIdentity.create(radio, mcc, mnc, lac, ci=ci, eci=eci)
-    else:
-        raise ValueError(f"unrecognized radio type: {radio}")
+    # row: date_start, date_end, radio, mcc, mnc, lac, ci, eci, rd_wkb, azimuth
+    try:
+        build_cell = _CELL_BUILDERS[row[2]]
+    except KeyError:
+        raise ValueError(f"unrecognized radio type: {row[2]}")
 
-    coords = RdPoint(rdx, rdy)
-    return Properties(wgs84=coords, azimuth_degrees=azimuth_degrees, cell=retrieved_ci)
+    x, y = _parse_point_wkb(row[8])
+    return Properties(
+        wgs84=RdPoint(x, y),
+        azimuth_degrees=row[9],
+        cell=build_cell(row[3], row[4], row[5], row[6], row[7]),
+    )
 
 
 def _build_cell_identity_query(ci):
+    # all values go through placeholders, so the query text depends only on
+    # which identity fields are present; a handful of query shapes (one per
+    # radio/identity form) then cover all cells, and the prepared-statement
+    # cache keyed on that text gets actual plan reuse
     qwhere = []
     qargs = []
     if ci.radio is not None:
         qwhere.append("radio = %s")
         qargs.append(ci.radio)
     if ci.mcc is not None:
-        qwhere.append(f"mcc = {ci.mcc}")
+        qwhere.append("mcc = %s")
+        qargs.append(ci.mcc)
     if ci.mnc is not None:
-        qwhere.append(f"mnc = {ci.mnc}")
+        qwhere.append("mnc = %s")
+        qargs.append(ci.mnc)
 
     if isinstance(ci, CellGlobalIdentity):
         if ci.lac is not None:
-            qwhere.append(f"lac = {ci.lac}")
+            qwhere.append("lac = %s")
+            qargs.append(ci.lac)
         if ci.ci is not None:
-            qwhere.append(f"ci = {ci.ci}")
+            qwhere.append("ci = %s")
+            qargs.append(ci.ci)
 
     elif isinstance(ci, LTECell):
         if ci.eci is not None:
-            qwhere.append(f"eci = {ci.eci}")
+            qwhere.append("eci = %s")
+            qargs.append(ci.eci)
 
     else:
         raise ValueError(f"unsupported cell type: {type(ci)}")
@@ -56,6 +96,19 @@ def _build_cell_identity_query(ci):
     return " AND ".join(qwhere), qargs
 
 
+# suffixes for server-side prepared statement names; a fresh name per
+# statement avoids collisions between instances sharing a connection
+_prepared_statement_ids = itertools.count()
+
+# suffixes for server-side cursor names; a fresh name per portal allows one
+# selection to be iterated repeatedly
+_cursor_ids = itertools.count()
+
+SELECT_COLUMNS = (
+    "date_start, date_end, radio, mcc, mnc, lac, ci, eci, ST_AsBinary(rd), azimuth"
+)
+
+
 class PgDatabase(CellDatabase):
     def __init__(
         self,
@@ -63,21 +116,54 @@ class PgDatabase(CellDatabase):
         qwhere=None,
         qargs=None,
         qorder=None,
+        qorder_args=None,
         count_limit: int = None,
         on_duplicate: Callable = duplicate_policy.warn,
     ):
         self._con = con
-        self._qwhere = qwhere or []
-        self._qargs = qargs or []
+        # immutable: derived instances share these without copying
+        self._qwhere = tuple(qwhere) if qwhere else ()
+        self._qargs = tuple(qargs) if qargs else ()
         self._qorder = qorder or ""
+        self._qorder_args = tuple(qorder_args) if qorder_args else ()
         self._count_limit = count_limit
         self._cur = None
+        self._in_context = False
         self._on_duplicate = on_duplicate
+        self._get_cur = None
+        self._prepared = {}
+        # cell IDs repeat heavily in real scans, so most lookups are cache hits
+        self._cached_get = lru_cache(maxsize=100_000)(self._query_get)
+
+    def _execute_prepared(self, query, args):
+        """
+        Execute `query` as a server-side prepared statement on a long-lived
+        cursor, so PostgreSQL parses and plans each distinct query only once.
+        """
+        if self._get_cur is None:
+            self._get_cur = self._con.cursor()
+
+        name = self._prepared.get(query)
+        if name is None:
+            name = f"pgdatabase_get_{next(_prepared_statement_ids)}"
+            parts = query.split("%s")
+            parameterized = parts[0] + "".join(
+                f"${i}{part}" for i, part in enumerate(parts[1:], start=1)
+            )
+            self._get_cur.execute(f"PREPARE {name} AS {parameterized}")
+            self._prepared[query] = name
+
+        placeholders = ", ".join(["%s"] * len(args))
+        self._get_cur.execute(f"EXECUTE {name}({placeholders})", args)
+        return self._get_cur
 
     def get(self, date: datetime.datetime, ci: CellIdentity) -> Optional[Properties]:
         """
         Retrieve a specific antenna from database.
 
+        Results are cached per (date, cell identity); use `clear_cache` after
+        modifying the underlying table.
+
         :param date: Used to select active antennas
         :param ci: The cell identity
         :return: The retrieved antenna or None
@@ -85,32 +171,124 @@ class PgDatabase(CellDatabase):
         if isinstance(date, datetime.date):
             date = datetime.datetime.combine(date, datetime.datetime.min.time())
 
-        qwhere = self._qwhere + [
+        return self._cached_get(date, ci)
+
+    def clear_cache(self):
+        self._cached_get.cache_clear()
+
+    def _query_get(self, date, ci):
+        qwhere = list(self._qwhere) + [
             "(date_start is NULL OR %s >= date_start) AND (date_end is NULL OR %s < date_end)"
         ]
-        qargs = self._qargs + [date, date]
+        qargs = list(self._qargs) + [date, date]
 
         add_qwhere, add_qargs = _build_cell_identity_query(ci)
         qwhere.append(add_qwhere)
         qargs.extend(add_qargs)
 
+        cur = self._execute_prepared(
+            f"""
+                SELECT {SELECT_COLUMNS}
+                FROM antenna_light
+                WHERE {' AND '.join(qw for qw in qwhere)}
+                LIMIT 2
+            """,
+            qargs,
+        )
+
+        results = [_build_antenna(row) for row in cur.fetchall()]
+        if len(results) == 0:
+            return None
+        elif len(results) > 1:
+            return self._on_duplicate(ci, results)
+        else:
+            return results[0]
+
+    def get_many(
+        self, queries: Iterable[Tuple[datetime.datetime, CellIdentity]]
+    ) -> Dict[Tuple[datetime.datetime, CellIdentity], Properties]:
+        """
+        Retrieve antennas for multiple (date, cell identity) pairs at once.
+
+        Equivalent to calling `get` for every pair, but issues a single
+        set-oriented query per cell type instead of one round trip per
+        lookup.
+
+        :param queries: (date, cell identity) pairs, as accepted by `get`
+        :return: mapping of each (date, cell identity) pair that was found to
+            its antenna, keyed by the pair as passed
+        """
+        cgi_queries = []
+        lte_queries = []
+        for date, ci in queries:
+            # the same cell may be queried at several dates and resolve to
+            # different antenna records; results are keyed by the full pair
+            key = (date, ci)
+            if isinstance(date, datetime.date):
+                date = datetime.datetime.combine(date, datetime.datetime.min.time())
+            if isinstance(ci, LTECell):
+                lte_queries.append((key, date, ci))
+            elif isinstance(ci, CellGlobalIdentity):
+                cgi_queries.append((key, date, ci))
+            else:
+                raise ValueError(f"unsupported cell type: {type(ci)}")
+
+        results = {}
+        if cgi_queries:
+            results.update(self._get_many_of_type(cgi_queries, ("lac", "ci")))
+        if lte_queries:
+            results.update(self._get_many_of_type(lte_queries, ("eci",)))
+        return results
+
+    def _get_many_of_type(self, queries, key_columns):
+        """
+        Issue one `unnest` JOIN query for a homogeneous batch of lookups,
+        keyed on mcc, mnc and `key_columns`.
+        """
+        columns = ("mcc", "mnc") + tuple(key_columns)
+        arrays = [[getattr(ci, column) for _, _, ci in queries] for column in columns]
+        arrays.append([ci.radio for _, _, ci in queries])
+        arrays.append([date for _, date, _ in queries])
+        arrays.append(list(range(len(queries))))
+
+        unnest = ", ".join(["%s::int[]"] * len(columns))
+        qwhere = list(self._qwhere) + [
+            "(date_start is NULL OR q.date >= date_start)",
+            "(date_end is NULL OR q.date < date_end)",
+            "(q.radio is NULL OR antenna_light.radio = q.radio)",
+        ] + [
+            f"(q.{column} is NULL OR antenna_light.{column} = q.{column})"
+            for column in columns
+        ]
+
         with self._con.cursor() as cur:
             cur.execute(
                 f"""
-                SELECT date_start, date_end, radio, mcc, mnc, lac, ci, eci, ST_X(rd), ST_Y(rd), azimuth
+                SELECT q.idx,
+                    antenna_light.date_start, antenna_light.date_end,
+                    antenna_light.radio, antenna_light.mcc, antenna_light.mnc,
+                    antenna_light.lac, antenna_light.ci, antenna_light.eci,
+                    ST_AsBinary(rd), azimuth
                 FROM antenna_light
+                CROSS JOIN unnest({unnest}, %s::text[], %s::timestamptz[], %s::int[])
+                    AS q({', '.join(columns)}, radio, date, idx)
                 WHERE {' AND '.join(qw for qw in qwhere)}
             """,
-                qargs,
+                arrays + list(self._qargs),
             )
 
-            results = [_build_antenna(row) for row in cur.fetchall()]
-            if len(results) == 0:
-                return None
-            elif len(results) > 1:
-                return self._on_duplicate(ci, results)
+            by_index = defaultdict(list)
+            for row in cur.fetchall():
+                by_index[row[0]].append(_build_antenna(row[1:]))
+
+        results = {}
+        for index, antennas in by_index.items():
+            key, _, ci = queries[index]
+            if len(antennas) > 1:
+                results[key] = self._on_duplicate(ci, antennas)
             else:
-                return results[0]
+                results[key] = antennas[0]
+        return results
 
     def search(
         self,
@@ -144,14 +322,19 @@ class PgDatabase(CellDatabase):
             assert (
                 distance_limit_m is not None
             ), "search for coords without distance limit"
-            coords = coords.rd()
+            rd = coords.rd()
             qwhere.append(
-                f"ST_DWithin(rd, 'SRID=4326;POINT({coords.rd().x} {coords.rd().y})', {distance_limit_m})"
+                "ST_DWithin(rd, ST_SetSRID(ST_MakePoint(%s, %s), 28992), %s)"
             )
+            qargs.extend([rd.x, rd.y, distance_limit_m])
             if distance_lower_limit_m is not None:
+                # annulus: the ST_DWithin above provides the index-backed
+                # bbox prefilter, so the lower bound only needs the exact
+                # distance test instead of a second index scan
                 qwhere.append(
-                    f"NOT ST_DWithin(rd, 'SRID=4326;POINT({coords.rd().x} {coords.rd().y})', {distance_lower_limit_m})"
+                    "ST_Distance(rd, ST_SetSRID(ST_MakePoint(%s, %s), 28992)) >= %s"
                 )
+                qargs.extend([rd.x, rd.y, distance_lower_limit_m])
         if date is not None:
             qwhere.append("(date_start is NULL OR %s >= date_start)")
             qwhere.append("(date_end is NULL OR %s < date_end)")
@@ -160,13 +343,15 @@ class PgDatabase(CellDatabase):
         if radio is not None:
             if isinstance(radio, str):
                 radio = [radio]
-            qwhere.append(f"({' OR '.join(['radio = %s'])})")
-            qargs.extend(radio)
+            qwhere.append("radio = ANY(%s)")
+            qargs.append(list(radio))
 
         if mcc is not None:
-            qwhere.append(f"mcc = {mcc}")
+            qwhere.append("mcc = %s")
+            qargs.append(mcc)
         if mnc is not None:
-            qwhere.append(f"mnc = {mnc}")
+            qwhere.append("mnc = %s")
+            qargs.append(mnc)
 
         if exclude is not None:
             if isinstance(exclude, CellIdentity):
@@ -178,28 +363,100 @@ class PgDatabase(CellDatabase):
 
         count_limit = count_limit if count_limit is not None else self._count_limit
         qorder = self._qorder
+        qorder_args = self._qorder_args
         if random_order is not None:
             if random_order:
                 qorder = "ORDER BY RANDOM()"
+                qorder_args = []
             elif coords is not None:
-                qorder = f"ORDER BY ST_Distance(rd, 'SRID=4326;POINT({coords.rd().x} {coords.rd().y})')"
+                # KNN operator: yields rows in distance order straight from
+                # the GIST index instead of sorting all matches
+                qorder = "ORDER BY rd <-> ST_SetSRID(ST_MakePoint(%s, %s), 28992)"
+                qorder_args = [rd.x, rd.y]
 
         return PgDatabase(
-            self._con, qwhere, qargs, qorder, count_limit, self._on_duplicate
+            self._con,
+            qwhere,
+            qargs,
+            qorder,
+            qorder_args,
+            count_limit,
+            self._on_duplicate,
         )
 
+    @property
+    def connection(self):
+        return self._con
+
+    def sql_join_clause(self, location_alias="l", cell_alias="cell") -> str:
+        """
+        LATERAL join clause resolving a measurement row's cell against
+        `antenna_light` on this connection, so callers on the same database
+        can fetch resolved geometry inline instead of issuing a lookup per
+        row. Exposes `antenna.rd_x`, `antenna.rd_y` and `antenna.azimuth`
+        (NULL when unresolved); of duplicate antennas the first is taken.
+        """
+        return f"""
+            LEFT JOIN LATERAL (
+                SELECT ST_X(a.rd) AS rd_x, ST_Y(a.rd) AS rd_y, a.azimuth
+                FROM antenna_light a
+                WHERE a.mcc = {cell_alias}.mcc AND a.mnc = {cell_alias}.mnc
+                    AND (({cell_alias}.radio IN ('GSM', 'UMTS') AND a.radio = {cell_alias}.radio
+                            AND a.lac = {cell_alias}.area AND a.ci = ({cell_alias}.cid & 65535))
+                        OR ({cell_alias}.radio = 'LTE' AND a.radio = 'LTE' AND a.eci = {cell_alias}.cid))
+                    AND (a.date_start IS NULL OR {location_alias}.timestamp >= a.date_start)
+                    AND (a.date_end IS NULL OR {location_alias}.timestamp < a.date_end)
+                LIMIT 1
+            ) antenna ON TRUE
+        """
+
+    def snapshot(self) -> InMemoryCellIndex:
+        """
+        Load all antennas matching the current selection into an in-process
+        index, so repeated lookups and radius queries over a stable snapshot
+        skip the database entirely.
+        """
+        # same order clause and limit as `__iter__`, so the snapshot holds
+        # exactly the antennas that iterating this selection yields
+        q = f"""
+            SELECT {SELECT_COLUMNS}
+            FROM antenna_light
+            WHERE {' AND '.join(self._qwhere) or 'TRUE'}
+            {self._qorder}
+        """
+        if self._count_limit is not None:
+            q += f" LIMIT {self._count_limit}"
+
+        with self._con.cursor() as cur:
+            cur.execute(q, list(self._qargs) + list(self._qorder_args))
+            return InMemoryCellIndex(
+                cur.fetchall(), _build_antenna, self._on_duplicate
+            )
+
     def __enter__(self):
-        self._cur = self._con.cursor()
+        self._in_context = True
         return self
 
     def __exit__(self, type, value, tb):
-        self._cur.close()
+        self._in_context = False
+        if self._cur is not None:
+            self._cur.close()
+            self._cur = None
 
     def __iter__(self):
-        assert self._cur is not None, "use within context"
+        assert self._in_context, "use within context"
+
+        # a named cursor cannot be re-executed, so every iteration opens a
+        # fresh server-side portal (closing the previous one); the portal
+        # fetches batches of `itersize` rows instead of materializing the
+        # whole result set
+        if self._cur is not None:
+            self._cur.close()
+        self._cur = self._con.cursor(name=f"celldb_{next(_cursor_ids)}")
+        self._cur.itersize = 10000
 
         q = f"""
-            SELECT date_start, date_end, radio, mcc, mnc, lac, ci, ST_X(rd), ST_Y(rd), azimuth
+            SELECT {SELECT_COLUMNS}
             FROM antenna_light
             WHERE {' AND '.join(qw for qw in self._qwhere)}
             {self._qorder}
@@ -207,7 +464,7 @@ class PgDatabase(CellDatabase):
         if self._count_limit is not None:
             q += f" LIMIT {self._count_limit}"
 
-        self._cur.execute(q, self._qargs)
+        self._cur.execute(q, self._qargs + self._qorder_args)
         return self
 
     def __next__(self):
@@ -231,58 +488,181 @@ class PgDatabase(CellDatabase):
             return cur.fetchone()[0]
 
 
+class _CsvLineStream(io.TextIOBase):
+    """
+    Read-only file-like object over an iterable of CSV lines, suitable as the
+    source stream for `cursor.copy_expert`.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self._lines = iter(lines)
+        self._buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._lines)
+            except StopIteration:
+                break
+
+        if size < 0:
+            chunk, self._buffer = self._buffer, ""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+_TRANSFORM_BATCH_SIZE = 8192
+
+
+def _count_rows(flo):
+    """
+    Count the remaining lines of a seekable file without keeping them in
+    memory, to give the progress bar a total; returns None for pipes.
+    """
+    try:
+        position = flo.tell()
+        count = sum(1 for _ in flo)
+        flo.seek(position)
+    except (OSError, io.UnsupportedOperation):
+        return None
+    return count
+
+
+def _project_batch(batch):
+    """
+    Project a batch of validated rows from WGS84 to RD with a single
+    vectorized transform call, avoiding per-row projection overhead.
+    """
+    lons = np.fromiter((values[8] for values in batch), dtype=np.float64, count=len(batch))
+    lats = np.fromiter((values[9] for values in batch), dtype=np.float64, count=len(batch))
+    xs, ys = WGS84_TO_RD.transform(lons, lats)
+    for values, x, y in zip(batch, xs, ys):
+        yield (*values[:8], x, y, values[10])
+
+
+def _parse_csv_rows(reader, show_progress=True, total=None):
+    """
+    Yield validated `antenna_light` value tuples, with the lon/lat columns
+    replaced by RD X/Y. Rows that fail validation are rejected with a
+    warning.
+    """
+    batch = []
+    for i, row in enumerate(
+        tqdm(reader, desc="reading cells", total=total, disable=not show_progress)
+    ):
+        try:
+            (
+                date_start,
+                date_end,
+                radio,
+                mcc,
+                mnc,
+                lac,
+                ci,
+                eci,
+                lon,
+                lat,
+                azimuth,
+            ) = [c if c != "" else None for c in row]
+            lon, lat = float(lon), float(lat)
+            assert math.isfinite(lon), f"invalid number for longitude: {lon}"
+            assert math.isfinite(lat), f"invalid number for latitude: {lat}"
+            assert ci is not None or eci is not None
+
+            WgsPoint(lon=lon, lat=lat)  # range check only; projection is batched
+            batch.append(
+                (date_start, date_end, radio, mcc, mnc, lac, ci, eci, lon, lat, azimuth)
+            )
+        except Exception as e:
+            warnings.warn(f"import error at line {i+2}: {e}")
+
+        if len(batch) >= _TRANSFORM_BATCH_SIZE:
+            yield from _project_batch(batch)
+            batch = []
+
+    if batch:
+        yield from _project_batch(batch)
+
+
+def _transform_csv_rows(reader, show_progress=True, total=None):
+    """
+    Yield validated CSV lines in `antenna_light` column order, with the RD
+    X/Y columns formatted as a single EWKT point.
+    """
+    # a csv.writer re-applies the quoting for embedded commas, quotes and
+    # newlines that the csv.reader legitimately parsed from the source; an
+    # unquoted empty field stays NULL under COPY's csv format
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for values in _parse_csv_rows(reader, show_progress, total):
+        *fields, x, y, azimuth = values
+        fields.append(f"SRID=28992;POINT({x} {y})")
+        fields.append(azimuth)
+        writer.writerow("" if value is None else value for value in fields)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
 def csv_import(con, flo, show_progress=True):
-    create_table(con)
+    # build indexes after the load: bulk index builds are much cheaper than
+    # maintaining five indexes for every copied row
+    create_table(con, with_indexes=False)
 
+    total = _count_rows(flo)
     reader = csv.reader(flo)
     next(reader)  # skip header
+    if total is not None:
+        total -= 1  # header
 
     with con.cursor() as cur:
-        for i, row in enumerate(
-            tqdm(list(reader), desc="reading cells", disable=not show_progress)
-        ):
-            try:
-                (
-                    date_start,
-                    date_end,
-                    radio,
-                    mcc,
-                    mnc,
-                    lac,
-                    ci,
-                    eci,
-                    lon,
-                    lat,
-                    azimuth,
-                ) = [c if c != "" else None for c in row]
-                lon, lat = float(lon), float(lat)
-                assert math.isfinite(lon), f"invalid number for longitude: {lon}"
-                assert math.isfinite(lat), f"invalid number for latitude: {lat}"
-                assert ci is not None or eci is not None
-
-                p = WgsPoint(lon=lon, lat=lat).rd()
-                cur.execute(
-                    f"""
-                    INSERT INTO antenna_light(date_start, date_end, radio, mcc, mnc, lac, ci, eci, rd, azimuth)
-                    VALUES(%s, %s, %s, %s, %s, %s, %s, %s, 'SRID=4326;POINT('||%s||' '||%s||')', %s)
-                """,
-                    (
-                        date_start,
-                        date_end,
-                        radio,
-                        mcc,
-                        mnc,
-                        lac,
-                        ci,
-                        eci,
-                        p.x,
-                        p.y,
-                        azimuth,
-                    ),
-                )
+        cur.execute("SET LOCAL synchronous_commit = OFF")
+        cur.execute("SET LOCAL maintenance_work_mem = '1GB'")
+        cur.copy_expert(
+            "COPY antenna_light(date_start, date_end, radio, mcc, mnc, lac, ci, eci, rd, azimuth)"
+            " FROM STDIN WITH (FORMAT csv)",
+            _CsvLineStream(_transform_csv_rows(reader, show_progress, total)),
+        )
+    create_indexes(con)
+    con.commit()
+
+
+def csv_import_batched(con, flo, show_progress=True, batch_size=8192):
+    """
+    Alternative to `csv_import` that inserts rows in batches with
+    `execute_values`. Slower than `COPY`, but a failing row only voids its
+    own batch rather than the whole import.
+    """
+    create_table(con, with_indexes=False)
+
+    reader = csv.reader(flo)
+    next(reader)  # skip header
+
+    query = """
+        INSERT INTO antenna_light(date_start, date_end, radio, mcc, mnc, lac, ci, eci, rd, azimuth)
+        VALUES %s
+    """
+    template = "(%s, %s, %s, %s, %s, %s, %s, %s, ST_SetSRID(ST_MakePoint(%s, %s), 28992), %s)"
+
+    with con.cursor() as cur:
+        batch = []
+        for values in _parse_csv_rows(reader, show_progress):
+            batch.append(values)
+            if len(batch) >= batch_size:
+                execute_values(cur, query, batch, template=template)
                 con.commit()
-            except Exception as e:
-                warnings.warn(f"import error at line {i+2}: {e}")
+                batch = []
+
+        if batch:
+            execute_values(cur, query, batch, template=template)
+            con.commit()
+
+    create_indexes(con)
+    con.commit()
 
 
 def csv_export(con, flo):
@@ -327,7 +707,7 @@ def csv_export(con, flo):
         cur.copy_expert(f"copy ({q}) to stdout with csv header", flo)
 
 
-def create_table(con):
+def create_table(con, with_indexes=True):
     tablename = "antenna_light"
     with con.cursor() as cur:
         cur.execute(f"DROP TABLE IF EXISTS {tablename}")
@@ -344,13 +724,36 @@ def create_table(con):
                 lac INT NULL,
                 ci INT NULL,
                 eci INT NULL,
-                rd GEOMETRY(point,4326) NOT NULL,
+                rd GEOMETRY(point,28992) NOT NULL,
                 azimuth INT NULL
             )
         """
         )
-        cur.execute(f"CREATE INDEX {tablename}_start ON {tablename}(date_start)")
-        cur.execute(f"CREATE INDEX {tablename}_end ON {tablename}(date_end)")
-        cur.execute(f"CREATE INDEX {tablename}_cgi ON {tablename}(mcc, mnc, lac, ci)")
-        cur.execute(f"CREATE INDEX {tablename}_ecgi ON {tablename}(mcc, mnc, eci)")
+    if with_indexes:
+        create_indexes(con)
+
+
+def create_indexes(con):
+    tablename = "antenna_light"
+    with con.cursor() as cur:
+        # BRIN suits the validity-range predicate: a fraction of the size of
+        # the former per-column btrees, and block-range pruning matches how
+        # rows accumulate over time
+        cur.execute(
+            f"CREATE INDEX {tablename}_date_brin ON {tablename} USING BRIN(date_start, date_end)"
+        )
+        # covering indexes: lead with the columns get() filters on and INCLUDE
+        # the selected columns, so point lookups are index-only scans
+        cur.execute(
+            f"""
+            CREATE INDEX {tablename}_cgi ON {tablename}(radio, mcc, mnc, lac, ci)
+                INCLUDE (date_start, date_end, eci, azimuth, rd)
+        """
+        )
+        cur.execute(
+            f"""
+            CREATE INDEX {tablename}_ecgi ON {tablename}(radio, mcc, mnc, eci)
+                INCLUDE (date_start, date_end, lac, ci, azimuth, rd)
+        """
+        )
         cur.execute(f"CREATE INDEX {tablename}_rd ON {tablename} USING GIST(rd)")
@@ -1,13 +1,37 @@
+import itertools
 import logging
 from typing import Iterable, Tuple
+from uuid import uuid4
 
 from celldb import CellDatabase
-from cellscanner.cellscanner_util import resolve_cell
+from cellscanner.cellscanner_util import resolve_cells
 from cellsite import CellMeasurement
 from colocation.measurement_pair import CellMeasurementPair
 
 LOG = logging.getLogger(__name__)
 
+# matches psycopg2's named-cursor itersize, so one resolver batch covers one
+# network fetch
+_FETCH_CHUNK_SIZE = 2000
+
+CELL_COLUMNS = ("radio", "mcc", "mnc", "area", "cid")
+
+
+def _cell_select(alias: str) -> str:
+    # GSM and UMTS cell ids carry the RNC in the upper bits; mask it off in
+    # the projection so Postgres does the per-row work instead of the fetch loop
+    masked_cid = f"CASE WHEN {alias}.radio IN ('GSM','UMTS') THEN {alias}.cid & 65535 ELSE {alias}.cid END"
+    return ",".join(
+        f"{masked_cid} {alias}_cid"
+        if colname == "cid"
+        else f"{alias}.{colname} {alias}_{colname}"
+        for colname in CELL_COLUMNS
+    )
+
+
+_CELL1_SELECT = _cell_select("cell1")
+_CELL2_SELECT = _cell_select("cell2")
+
 
 class CellscannerMeasurementPairGenerator:
     def __init__(self, con, cell_resolver: CellDatabase, seed=None, **kwargs):
@@ -23,23 +47,51 @@ class CellscannerMeasurementPairGenerator:
         self._seed = seed
 
     def _fetch_rows(self, rows, is_colocated: bool):
-        for row in rows:
-            timestamp1 = row[0]
-            ci1, geo1 = resolve_cell(self.cell_resolver, timestamp1, *row[1:6])
-            timestamp2 = row[6]
-            ci2, geo2 = resolve_cell(self.cell_resolver, timestamp2, *row[7:12])
-            if geo1 is not None and geo2 is not None:
-                measurement1 = CellMeasurement(timestamp1, ci1, geo=geo1)
-                measurement2 = CellMeasurement(timestamp2, ci2, geo=geo2)
-                yield CellMeasurementPair(
-                    measurement1, measurement2, is_colocated=is_colocated
-                )
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, _FETCH_CHUNK_SIZE))
+            if not chunk:
+                break
+
+            # resolve both sides of the chunk in two batched lookups instead
+            # of two round trips per row; the second lookup only covers rows
+            # whose first side resolved, as a miss discards the pair anyway
+            resolved1 = resolve_cells(
+                self.cell_resolver, ((row[0], *row[1:6]) for row in chunk)
+            )
+            survivors = [
+                (row, ci1, geo1)
+                for row, (ci1, geo1) in zip(chunk, resolved1)
+                if geo1 is not None
+            ]
+            resolved2 = resolve_cells(
+                self.cell_resolver, ((row[6], *row[7:12]) for row, _, _ in survivors)
+            )
+            for (row, ci1, geo1), (ci2, geo2) in zip(survivors, resolved2):
+                if geo2 is not None:
+                    measurement1 = CellMeasurement(row[0], ci1, geo=geo1)
+                    measurement2 = CellMeasurement(row[6], ci2, geo=geo2)
+                    yield CellMeasurementPair(
+                        measurement1, measurement2, is_colocated=is_colocated
+                    )
 
     def get_colocated_pairs(
-        self, delay_range: Tuple[int, int], limit: int
+        self,
+        delay_range: Tuple[int, int],
+        limit: int,
+        oversample_factor: int = 4,
     ) -> Iterable[CellMeasurementPair]:
+        """
+        Draws up to `limit` random colocated pairs.
+
+        @param delay_range: the minimum and maximum delay in seconds between the measurements in a pair
+        @param limit: the maximum number of pairs to return
+        @param oversample_factor: how many locationinfo rows to sample per
+            requested pair; rows are lost to the cellinfo joins and to cells
+            that fail to resolve, so a warning is logged when fewer than
+            `limit` pairs come out and a higher factor may be needed
+        """
         sql_random_log = "(exp(random())-1) / (exp(1)-1)"  # generates a random number in range 0..1 on a log scale
-        CELL_COLUMNS = ["radio", "mcc", "mnc", "area", "cid"]
         delay_min, delay_max = delay_range
         with self._con.cursor() as cur:
             cur.execute(
@@ -48,26 +100,42 @@ class CellscannerMeasurementPairGenerator:
             cur.execute(
                 "CREATE INDEX IF NOT EXISTS locationinfo_rnd_index ON locationinfo_rnd(rnd)"
             )
+            qinsert_limit = ""
+            if limit is not None:
+                # no point materializing (and indexing) one temp row per
+                # locationinfo row to keep `limit` pairs; oversample so
+                # enough rows survive the cellinfo joins below
+                qinsert_limit = f"ORDER BY random() LIMIT {limit * oversample_factor}"
             cur.execute(
                 f"""INSERT INTO locationinfo_rnd
                     SELECT locationinfo.id as locationinfo_id,
                         locationinfo.timestamp + interval '{delay_min} seconds' + {sql_random_log} * interval '{delay_max - delay_min} seconds',
                         RANDOM() as rnd
                     FROM locationinfo
+                    {qinsert_limit}
             """
             )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS locationinfo_rnd_id_index ON locationinfo_rnd(locationinfo_id)"
+            )
+            # fresh temp tables have no statistics; without ANALYZE the big
+            # join below is planned blind and tends to nested-loop
+            cur.execute("ANALYZE locationinfo_rnd")
 
-            qlimit = ""
-            if limit is not None:
-                qlimit = f"LIMIT {limit}"
+        qlimit = ""
+        if limit is not None:
+            qlimit = f"LIMIT {limit}"
 
+        # named cursor: rows stream in while pairs are consumed, instead of
+        # materializing the whole join result before the first yield
+        with self._con.cursor(name=f"pairs_{uuid4().hex}") as cur:
             cur.execute(
                 f"""
                 SELECT
                     l.timestamp,
-                    {','.join(f"cell1.{colname} cell1_{colname}" for colname in CELL_COLUMNS)},
+                    {_CELL1_SELECT},
                     rnd.delayed_timestamp,
-                    {','.join(f"cell2.{colname} cell2_{colname}" for colname in CELL_COLUMNS)}
+                    {_CELL2_SELECT}
                 FROM locationinfo l
                     JOIN locationinfo_rnd rnd ON rnd.locationinfo_id = l.id
                     JOIN cellinfo cell1 ON cell1.device_id = l.device_id AND delayed_timestamp >= cell1.date_start AND delayed_timestamp < cell1.date_end
@@ -77,10 +145,19 @@ class CellscannerMeasurementPairGenerator:
             """
             )
 
-            yield from self._fetch_rows(cur.fetchall(), is_colocated=True)
+            n_pairs = 0
+            for pair in self._fetch_rows(cur, is_colocated=True):
+                n_pairs += 1
+                yield pair
+
+        if limit is not None and n_pairs < limit:
+            LOG.warning(
+                f"requested {limit} colocated pairs but only {n_pairs} were produced; "
+                f"join selectivity or unresolvable cells may require a higher "
+                f"oversample_factor (currently {oversample_factor})"
+            )
 
     def get_dislocated_pairs(self, limit: int) -> Iterable[CellMeasurementPair]:
-        CELL_COLUMNS = ["radio", "mcc", "mnc", "area", "cid"]
         with self._con.cursor() as cur:
             cur.execute(
                 "CREATE TEMPORARY TABLE IF NOT EXISTS cellinfo_rnd (cellinfo_id INT NOT NULL, rnd FLOAT NOT NULL)"
@@ -95,33 +172,42 @@ class CellscannerMeasurementPairGenerator:
                     FROM cellinfo
             """
             )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS cellinfo_rnd_id_index ON cellinfo_rnd(cellinfo_id)"
+            )
+            cur.execute("ANALYZE cellinfo_rnd")
 
-            qlimit = ""
-            if limit is not None:
-                qlimit = f"LIMIT {limit}"
+        qlimit = ""
+        if limit is not None:
+            qlimit = f"LIMIT {limit}"
 
-            # create table `cell_pair` containing pairs of cells of the same device, but ordered randomly
+        # number the cells of each device in random order and pair each cell
+        # with its successor; partitioning by device means no cross-device
+        # rows are generated only to be filtered out afterwards
+        with self._con.cursor(name=f"pairs_{uuid4().hex}") as cur:
             cur.execute(
                 f"""
-                WITH cell_pair AS (
+                WITH cell_rnd AS (
                     SELECT
-                        cell.id AS cell1_id,
-                        LAG(cell.id, 1) OVER (ORDER BY device_id, rnd.rnd) AS cell2_id
+                        cell.id,
+                        cell.device_id,
+                        rnd.rnd,
+                        ROW_NUMBER() OVER (PARTITION BY cell.device_id ORDER BY rnd.rnd) AS rn
                     FROM cellinfo cell
                         JOIN cellinfo_rnd rnd ON rnd.cellinfo_id = cell.id
-                    ORDER BY rnd.rnd
                 )
                 SELECT
                     cell1.date_start,
-                    {','.join(f"cell1.{colname} cell1_{colname}" for colname in CELL_COLUMNS)},
+                    {_CELL1_SELECT},
                     cell1.date_start,
-                    {','.join(f"cell2.{colname} cell2_{colname}" for colname in CELL_COLUMNS)}
-                FROM cell_pair pair
-                    JOIN cellinfo cell1 ON cell1.id = pair.cell1_id
-                    JOIN cellinfo cell2 ON cell2.id = pair.cell2_id
-                WHERE cell1.device_id = cell2.device_id
+                    {_CELL2_SELECT}
+                FROM cell_rnd pair1
+                    JOIN cell_rnd pair2 ON pair2.device_id = pair1.device_id AND pair2.rn = pair1.rn + 1
+                    JOIN cellinfo cell1 ON cell1.id = pair1.id
+                    JOIN cellinfo cell2 ON cell2.id = pair2.id
+                ORDER BY pair1.rnd
                 {qlimit}
             """
             )
 
-            yield from self._fetch_rows(cur.fetchall(), is_colocated=False)
+            yield from self._fetch_rows(cur, is_colocated=False)
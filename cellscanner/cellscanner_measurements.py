@@ -1,17 +1,162 @@
 import datetime
+import io
 import logging
+import queue
+import struct
 import sys
 from abc import ABC
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
 from typing import Iterable, Tuple, List, Sequence, Iterator, Optional, Set
 
 from celldb import CellDatabase
-from cellscanner.cellscanner_util import resolve_cell
-from cellsite import CellMeasurement, WgsPoint, Angle, CellIdentity
+from cellscanner.cellscanner_util import build_cell_identity, resolve_cell
+from cellsite import CellMeasurement, WgsPoint, CellIdentity
+from cellsite.coord import RdPoint
 from cellsite.measurement import CellMeasurementSet
-from cellsite.properties import LocationInfo
+from cellsite.properties import LocationInfo, Properties
 
 LOG = logging.getLogger(__name__)
 
+# decoders for postgres binary COPY field data; numeric widths vary with the
+# column type, so floats and ints dispatch on the field length
+_PG_EPOCH = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _decode_timestamptz(data: bytes) -> datetime.datetime:
+    return _PG_EPOCH + datetime.timedelta(microseconds=struct.unpack(">q", data)[0])
+
+
+def _decode_text(data: bytes) -> str:
+    return data.decode()
+
+
+def _decode_float(data: bytes) -> float:
+    return struct.unpack(">f" if len(data) == 4 else ">d", data)[0]
+
+
+def _decode_int(data: bytes) -> int:
+    return int.from_bytes(data, "big", signed=True)
+
+
+_BULK_DECODERS = (
+    _decode_timestamptz,  # timestamp
+    _decode_text,  # track_name
+    _decode_text,  # device_name
+    _decode_float,  # latitude
+    _decode_float,  # longitude
+    _decode_float,  # accuracy
+    _decode_float,  # speed
+    _decode_float,  # bearing_deg
+    _decode_text,  # radio
+    _decode_int,  # mcc
+    _decode_int,  # mnc
+    _decode_int,  # area
+    _decode_int,  # cid
+)
+
+_COPY_BINARY_SIGNATURE = b"PGCOPY\n\377\r\n\0"
+
+
+class _ChunkQueueWriter:
+    """
+    File-like sink for `copy_expert` that hands each chunk to a bounded
+    queue, so a reader in another thread can parse rows while the copy is
+    still running.
+    """
+
+    def __init__(self, max_chunks: int = 64):
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._aborted = False
+
+    def write(self, chunk):
+        if self._aborted:
+            # raising here makes `copy_expert` abort the running COPY
+            raise IOError("the consuming iterator is gone")
+        self._queue.put(bytes(chunk))
+        return len(chunk)
+
+    def close(self):
+        self._queue.put(None)
+
+    def abort(self):
+        self._aborted = True
+        # drain so a `write` blocked on a full queue can observe the abort
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def __iter__(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            yield chunk
+
+
+def _iter_copy_binary_rows(chunks: Iterable[bytes]) -> Iterator[Tuple]:
+    """
+    Decodes the rows of a binary COPY stream as its chunks arrive, keeping
+    only the unparsed tail in memory.
+    """
+    chunks = iter(chunks)
+    buffer = bytearray()
+    offset = 0
+
+    def ensure(size):
+        # pull chunks until `size` bytes can be read at the current offset;
+        # parsed bytes are discarded first, so the buffer stays chunk-sized
+        nonlocal buffer, offset
+        while len(buffer) - offset < size:
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError("truncated binary COPY stream")
+            if offset:
+                del buffer[:offset]
+                offset = 0
+            buffer += chunk
+
+    ensure(len(_COPY_BINARY_SIGNATURE) + 8)
+    assert bytes(buffer[: len(_COPY_BINARY_SIGNATURE)]) == _COPY_BINARY_SIGNATURE
+    # skip signature, flags and header extension
+    (ext_length,) = struct.unpack_from(">i", buffer, len(_COPY_BINARY_SIGNATURE) + 4)
+    offset = len(_COPY_BINARY_SIGNATURE) + 8
+    ensure(ext_length)
+    offset += ext_length
+
+    unpack_int16 = struct.Struct(">h").unpack_from
+    unpack_int32 = struct.Struct(">i").unpack_from
+    while True:
+        ensure(2)
+        (field_count,) = unpack_int16(buffer, offset)
+        offset += 2
+        if field_count == -1:  # trailer
+            return
+
+        row = []
+        for decode in _BULK_DECODERS[:field_count]:
+            ensure(4)
+            (length,) = unpack_int32(buffer, offset)
+            offset += 4
+            if length == -1:
+                row.append(None)
+            else:
+                ensure(length)
+                row.append(decode(bytes(buffer[offset : offset + length])))
+                offset += length
+        yield tuple(row)
+
+CELL_COLUMNS = ("radio", "mcc", "mnc", "area", "cid")
+# GSM and UMTS cell ids carry the RNC in the upper bits; mask it off in the
+# projection so Postgres does the per-row work instead of the fetch loop
+_MASKED_CID = "CASE WHEN cell.radio IN ('GSM','UMTS') THEN cell.cid & 65535 ELSE cell.cid END"
+_CELL_SELECT = ",".join(
+    f"{_MASKED_CID} AS cid" if colname == "cid" else f"cell.{colname}"
+    for colname in CELL_COLUMNS
+)
+
 
 class CellscannerMeasurementSet(CellMeasurementSet):
     def __init__(
@@ -23,6 +168,8 @@ class CellscannerMeasurementSet(CellMeasurementSet):
         devices: Optional[List[str]] = None,
         sort_key: Optional[str] = None,
         limit: Optional[int] = None,
+        sampled: bool = False,
+        pool=None,
     ):
         super().__init__()
         self._con = con
@@ -32,6 +179,9 @@ class CellscannerMeasurementSet(CellMeasurementSet):
         self._selected_devices = devices
         self._sort_key = sort_key
         self._limit = limit
+        self._sampled = sampled
+        self._pool = pool
+        self._summary = None
 
     def add(self, measurement: CellMeasurement):
         raise NotImplemented()
@@ -43,16 +193,46 @@ class CellscannerMeasurementSet(CellMeasurementSet):
             "devices": self._selected_devices,
             "sort_key": self._sort_key,
             "limit": self._limit,
+            "sampled": self._sampled,
+            "pool": self._pool,
         }
         augmentations.update(selection)
         return CellscannerMeasurementSet(
             con=self._con,
             cell_resolver=self.cell_resolver,
-            **selection,
+            **augmentations,
         )
 
+    def summary(self) -> dict:
+        """
+        Computes the measurement count, track names and device names of this
+        set in a single query, rather than one round trip per figure. The
+        result is cached and shared by `__len__`, `track_names` and
+        `device_names`.
+
+        @return: a dict with keys `count`, `track_names` and `device_names`
+        """
+        if self._summary is None:
+            qselect = """
+                COUNT(*),
+                array_agg(DISTINCT device.install_id),
+                array_agg(DISTINCT cell.subscription)
+            """
+            q, qargs = self._build_query(qselect)
+            with self._con.cursor() as cur:
+                cur.execute(q, qargs)
+                count, track_names, device_names = cur.fetchone()
+            self._summary = {
+                "count": count,
+                "track_names": track_names or [],
+                "device_names": device_names or [],
+            }
+        return self._summary
+
     @property
     def track_names(self) -> List[str]:
+        if self._summary is not None:
+            return self._summary["track_names"]
         qselect = "DISTINCT device.install_id"
         q, qargs = self._build_query(qselect)
         with self._con.cursor() as cur:
@@ -61,6 +241,8 @@ class CellscannerMeasurementSet(CellMeasurementSet):
 
     @property
     def device_names(self) -> List[str]:
+        if self._summary is not None:
+            return self._summary["device_names"]
         qselect = "DISTINCT cell.subscription"
         q, qargs = self._build_query(qselect)
         with self._con.cursor() as cur:
@@ -68,18 +250,17 @@ class CellscannerMeasurementSet(CellMeasurementSet):
             return [row[0] for row in cur]
 
     def get_cells(self) -> Set[CellIdentity]:
-        cell_fields = ["cell.radio", "cell.mcc", "cell.mnc", "cell.area", "cell.cid"]
-        qselect = f"DISTINCT {','.join(cell_fields)}"
+        qselect = f"DISTINCT {_CELL_SELECT}"
         q, qargs = self._build_query(qselect)
         with self._con.cursor() as cur:
             cur.execute(q, qargs)
             return set([CellIdentity.create(radio=radio, mcc=mcc, mnc=mnc, lac=lac, ci=ci, eci=ci) for radio, mcc, mnc, lac, ci in cur])
 
     def select_by_track(self, *track_names: str) -> CellMeasurementSet:
-        return self._create_augmented_set(selected_tracks=track_names)
+        return self._create_augmented_set(tracks=track_names)
 
     def select_by_device(self, *device_names: str) -> CellMeasurementSet:
-        return self._create_augmented_set(selected_devices=device_names)
+        return self._create_augmented_set(devices=device_names)
 
     def select_by_timestamp(self, timestamp_from: datetime.datetime,
                             timestamp_to: datetime.datetime) -> CellMeasurementSet:
@@ -97,22 +278,39 @@ class CellscannerMeasurementSet(CellMeasurementSet):
     def select_by_max_accuracy(self, accuracy: int) -> CellMeasurementSet:
         return self._create_augmented_set(max_accuracy_m=accuracy)
 
-    def _build_query(self, qselect: str) -> Tuple[str, Sequence]:
+    def _estimate_row_count(self, tablename: str) -> float:
+        """
+        Returns the planner's row estimate for `tablename`, which is cheap to
+        obtain but may be stale or 0 for tables that were never analyzed.
+        """
+        with self._con.cursor() as cur:
+            cur.execute(
+                "SELECT reltuples FROM pg_class WHERE relname = %s", (tablename,)
+            )
+            row = cur.fetchone()
+            return row[0] if row is not None else 0
+
+    @cached_property
+    def _query_parts(self) -> Tuple[str, str, str, Sequence]:
+        """
+        The WHERE clause, TABLESAMPLE clause, ORDER BY/LIMIT tail and query
+        arguments. These are fixed per instance — augmenting methods return
+        new instances — so they are computed once and shared by every query
+        this set issues.
+        """
         qwhere = []
         qargs = []
 
+        # array binding (= ANY) keeps the SQL text identical regardless of
+        # the number of selected values, so Postgres reuses a single plan
         if self._selected_tracks is not None:
-            qwhere.append(
-                f"(device.install_id in ({','.join(['%s'] * len(self._selected_tracks))}) OR device.tag in ({','.join(['%s'] * len(self._selected_tracks))}))"
-            )
-            qargs.extend(self._selected_tracks)
-            qargs.extend(self._selected_tracks)
+            qwhere.append("(device.install_id = ANY(%s) OR device.tag = ANY(%s))")
+            qargs.append(list(self._selected_tracks))
+            qargs.append(list(self._selected_tracks))
 
         if self._selected_devices is not None:
-            qwhere.append(
-                f"subscription in ({','.join(['%s'] * len(self._selected_devices))})"
-            )
-            qargs.extend(self._selected_devices)
+            qwhere.append("subscription = ANY(%s)")
+            qargs.append(list(self._selected_devices))
 
         if self._max_accuracy_m is not None:
             qwhere.append("accuracy <= %s")
@@ -125,35 +323,63 @@ class CellscannerMeasurementSet(CellMeasurementSet):
         if self._sort_key is not None:
             qorder = f"ORDER BY {self._sort_key}"
 
+        qsample = ""
         qlimit = ""
         if self._limit is not None:
             qlimit = f"LIMIT {self._limit}"
-            #if qorder == "":
-            #    qorder = "ORDER BY random()"
+            if self._sampled and self._sort_key is None:
+                # sampling before sorting avoids ordering the full relation
+                # by random() just to keep `limit` rows; the sample is sized
+                # at ~10x the limit so the subsequent LIMIT rarely starves
+                est_rows = self._estimate_row_count("locationinfo")
+                if est_rows > 0:
+                    percentage = min(100.0, 1000.0 * self._limit / est_rows)
+                    qsample = f"TABLESAMPLE BERNOULLI ({percentage})"
+                qorder = "ORDER BY random()"
+
+        return " AND ".join(qwhere), qsample, f"{qorder}\n                {qlimit}", qargs
 
+    def _build_query(self, qselect: str, qjoin: str = "") -> Tuple[str, Sequence]:
+        qwhere, qsample, qtail, qargs = self._query_parts
         q = f"""
                 SELECT {qselect}
-                FROM locationinfo l
+                FROM locationinfo l {qsample}
                     JOIN device ON l.device_id = device.id
                     JOIN cellinfo cell ON cell.device_id = device.id
-                WHERE {' AND '.join(qwhere)}
-                {qorder}
-                {qlimit}
+                    {qjoin}
+                WHERE {qwhere}
+                {qtail}
             """
 
         return q, qargs
 
     def iter_measurements(self) -> Iterable[CellMeasurement]:
-        cell_fields = ["radio", "mcc", "mnc", "area", "cid"]
+        # when the resolver lives on the same connection, fuse the lookup
+        # into the measurement query instead of resolving per row
+        if (
+            hasattr(self.cell_resolver, "sql_join_clause")
+            and getattr(self.cell_resolver, "connection", None) is self._con
+        ):
+            yield from self._iter_measurements_resolved()
+            return
+
         qselect = f"""
             l.timestamp,
             COALESCE(device.tag, device.install_id) as track_name,
             cell.subscription as device_name,
             l.latitude, l.longitude, l.accuracy, l.speed, l.bearing_deg,
-            {','.join(f"cell.{colname}" for colname in cell_fields)}
+            {_CELL_SELECT}
         """
         q, qargs = self._build_query(qselect)
 
+        # local bindings: the loop below runs once per row, and LOAD_FAST
+        # beats global/attribute lookups on the hot path
+        resolve = resolve_cell
+        resolver = self.cell_resolver
+        location_info = LocationInfo
+        wgs_point = WgsPoint
+        cell_measurement = CellMeasurement
+
         with self._con.cursor() as cur:
             cur.execute(q, qargs)
             for (
@@ -171,16 +397,176 @@ class CellscannerMeasurementSet(CellMeasurementSet):
                 lac,
                 ci,
             ) in cur:
-                cell, cellinfo = resolve_cell(
-                    self.cell_resolver, timestamp, radio, mcc, mnc, lac, ci
+                cell, cellinfo = resolve(
+                    resolver, timestamp, radio, mcc, mnc, lac, ci
+                )
+                locationinfo = location_info(
+                    wgs84=wgs_point(lat=latitude, lon=longitude),
+                    accuracy=accuracy,
+                    speed=speed,
+                    bearing_deg=bearing_deg,
                 )
+                yield cell_measurement(
+                    timestamp,
+                    cell=cell,
+                    track=track,
+                    device=device,
+                    geo=cellinfo,
+                    device_geo=locationinfo,
+                )
+
+    def iter_measurements_bulk(self) -> Iterator[Tuple]:
+        """
+        Streams the raw measurement rows over a binary COPY instead of a
+        cursor. Binary format skips the per-column text rendering and parsing
+        on both ends, and the driver's row materialization is bypassed
+        entirely — suited for feeding analytics that do not need
+        `CellMeasurement` objects. The COPY runs in a background thread
+        feeding a bounded buffer, so memory use is independent of the result
+        size.
+
+        @return: tuples with the columns of `iter_measurements`'s query, in
+            order: timestamp, track, device, latitude, longitude, accuracy,
+            speed, bearing_deg, radio, mcc, mnc, area, cid
+        """
+        qselect = f"""
+            l.timestamp,
+            COALESCE(device.tag, device.install_id) as track_name,
+            cell.subscription as device_name,
+            l.latitude, l.longitude, l.accuracy, l.speed, l.bearing_deg,
+            {_CELL_SELECT}
+        """
+        q, qargs = self._build_query(qselect)
+
+        writer = _ChunkQueueWriter()
+
+        def pump():
+            try:
+                with self._con.cursor() as cur:
+                    cur.copy_expert(
+                        cur.mogrify(f"COPY ({q}) TO STDOUT WITH BINARY", qargs), writer
+                    )
+            finally:
+                writer.close()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(pump)
+            done = False
+            try:
+                try:
+                    yield from _iter_copy_binary_rows(writer)
+                    done = True
+                except ValueError:
+                    # a database error aborts the copy mid-stream; surface it
+                    # rather than the resulting truncation
+                    future.result()
+                    raise
+            finally:
+                writer.abort()
+                try:
+                    future.result()
+                except Exception:
+                    # when the consumer stops early, the aborted COPY raising
+                    # in the background is expected
+                    if done:
+                        raise
+
+    def iter_measurements_by_track_parallel(
+        self, n_workers: int = 4
+    ) -> Iterable[CellMeasurement]:
+        """
+        Iterates measurements grouped by track, fetching the tracks over
+        `n_workers` pooled connections in parallel. Requires a connection
+        pool passed at construction; without one the tracks are fetched
+        serially over this set's connection.
+
+        The measurements of one track arrive together, but the order of the
+        tracks depends on query completion and is not deterministic.
+
+        @param n_workers: the number of tracks fetched concurrently
+        """
+        track_names = self.track_names
+        if self._pool is None:
+            for track in track_names:
+                yield from self.select_by_track(track).iter_measurements()
+            return
+
+        def fetch(track):
+            con = self._pool.getconn()
+            try:
+                mset = CellscannerMeasurementSet(
+                    con=con,
+                    cell_resolver=self.cell_resolver,
+                    max_accuracy_m=self._max_accuracy_m,
+                    tracks=[track],
+                    devices=self._selected_devices,
+                    sort_key=self._sort_key,
+                    limit=self._limit,
+                    sampled=self._sampled,
+                )
+                return list(mset.iter_measurements())
+            finally:
+                self._pool.putconn(con)
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(fetch, track) for track in track_names]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    def _iter_measurements_resolved(self) -> Iterable[CellMeasurement]:
+        """
+        Single-query variant of `iter_measurements` that joins the resolver's
+        antenna table inline, collapsing the N per-row lookups into the main
+        query.
+        """
+        qselect = f"""
+            l.timestamp,
+            COALESCE(device.tag, device.install_id) as track_name,
+            cell.subscription as device_name,
+            l.latitude, l.longitude, l.accuracy, l.speed, l.bearing_deg,
+            {_CELL_SELECT},
+            antenna.rd_x, antenna.rd_y, antenna.azimuth
+        """
+        q, qargs = self._build_query(
+            qselect, qjoin=self.cell_resolver.sql_join_clause()
+        )
+
+        with self._con.cursor() as cur:
+            cur.execute(q, qargs)
+            for (
+                timestamp,
+                track,
+                device,
+                latitude,
+                longitude,
+                accuracy,
+                speed,
+                bearing_deg,
+                radio,
+                mcc,
+                mnc,
+                lac,
+                ci,
+                rd_x,
+                rd_y,
+                azimuth,
+            ) in cur:
+                cell = build_cell_identity(radio, mcc, mnc, lac, ci)
+                if rd_x is None:
+                    LOG.warning(f"unable to resolve {cell} at {timestamp}")
+                    cellinfo = None
+                else:
+                    cellinfo = Properties(
+                        wgs84=RdPoint(rd_x, rd_y),
+                        azimuth_degrees=azimuth,
+                        cell=cell,
+                    )
                 locationinfo = LocationInfo(
                     wgs84=WgsPoint(lat=latitude, lon=longitude),
                     accuracy=accuracy,
                     speed=speed,
+                    bearing_deg=bearing_deg,
                 )
-                if bearing_deg is not None:
-                    locationinfo["bearing"] = Angle(degrees=bearing_deg)
                 yield CellMeasurement(
                     timestamp,
                     cell=cell,
@@ -194,6 +580,8 @@ class CellscannerMeasurementSet(CellMeasurementSet):
         yield from self.iter_measurements()
 
     def __len__(self):
+        if self._summary is not None:
+            return self._summary["count"]
         qselect = "COUNT(*)"
         q, qargs = self._build_query(qselect)
         with self._con.cursor() as cur:
@@ -1,6 +1,7 @@
 import logging
 import warnings
-from typing import Tuple, Optional
+from functools import lru_cache
+from typing import Iterable, List, Tuple, Optional
 
 from cellsite import CellIdentity
 
@@ -8,14 +9,50 @@ from cellsite import CellIdentity
 LOG = logging.getLogger(__name__)
 
 
+# cell identities repeat across thousands of rows; building each tuple once
+# turns the per-row factory call into a dict hit
+@lru_cache(maxsize=200_000)
+def build_cell_identity(radio, mcc, mnc, lac, ci) -> CellIdentity:
+    # GSM/UMTS cid masking happens in the SQL projections; `ci` arrives clean
+    return CellIdentity.create(radio=radio, mcc=mcc, mnc=mnc, lac=lac, ci=ci, eci=ci)
+
+
 def resolve_cell(
     cell_resolver, timestamp, radio, mcc, mnc, lac, ci
 ) -> Tuple[CellIdentity, Optional[dict]]:
-    if radio == "GSM" or radio == "UMTS":
-        ci = ci & 0xFFFF
-    ci = CellIdentity.create(radio=radio, mcc=mcc, mnc=mnc, lac=lac, ci=ci, eci=ci)
+    ci = build_cell_identity(radio, mcc, mnc, lac, ci)
     properties = cell_resolver.get(timestamp, ci)
     if properties is None:
         LOG.warning(f"unable to resolve {ci} at {timestamp}")
 
     return ci, properties
+
+
+def resolve_cells(
+    cell_resolver, queries: Iterable[Tuple]
+) -> List[Tuple[CellIdentity, Optional[dict]]]:
+    """
+    Resolve a batch of (timestamp, radio, mcc, mnc, lac, ci) tuples at once.
+
+    Uses the resolver's set-oriented `get_many` when available, avoiding one
+    database round trip per lookup; otherwise falls back to per-row `get`.
+    """
+    identities = [
+        (timestamp, build_cell_identity(*fields)) for timestamp, *fields in queries
+    ]
+
+    get_many = getattr(cell_resolver, "get_many", None)
+    found = get_many(identities) if get_many is not None else None
+
+    results = []
+    for timestamp, ci in identities:
+        if found is not None:
+            # `get_many` keys its results by the full (date, ci) pair, so
+            # the same cell observed at different times resolves per date
+            properties = found.get((timestamp, ci))
+        else:
+            properties = cell_resolver.get(timestamp, ci)
+        if properties is None:
+            LOG.warning(f"unable to resolve {ci} at {timestamp}")
+        results.append((ci, properties))
+    return results
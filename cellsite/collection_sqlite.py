@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import datetime
+import itertools
 import logging
 import random
 import sqlite3
@@ -31,6 +32,8 @@ SQL_TYPES = [
 
 LOG = logging.getLogger(__name__)
 
+_INSERT_CHUNK_SIZE = 10_000
+
 
 def get_sql_type(key: str, value: Any) -> str:
     for serializer, type_name in SQL_TYPES:
@@ -70,6 +73,21 @@ def sql_literal(value: Any) -> str:
         return f"'{escape_sql(str(value))}'"
 
 
+def sql_value(value: Any) -> Any:
+    """
+    Converts a value to a type accepted by sqlite parameter binding; the
+    bound counterpart of `sql_literal`.
+    """
+    if value is None or isinstance(value, (bool, int)):
+        return value
+    elif isinstance(value, datetime.datetime):
+        return value.isoformat()
+    elif isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    else:
+        return str(value)
+
+
 class SqliteCollection(Iterable[Item], Sized, ABC):
     def __init__(
         self,
@@ -83,9 +101,12 @@ class SqliteCollection(Iterable[Item], Sized, ABC):
         self._root_name = root_name or table_name
 
         self._fields = self._find_fields()
+        # the INSERT statement is cached per field layout, so sqlite reuses
+        # one prepared plan as long as the schema does not evolve
+        self._insert_statement = None
+        self._indexed_fields = set()
         if items is not None:
-            for item in items:
-                self.add(item)
+            self.extend(items)
 
     def _get_columns(self):
         return [
@@ -106,7 +127,7 @@ class SqliteCollection(Iterable[Item], Sized, ABC):
             )
 
     def _create_index(self, field: str):
-        if self._fields is None:
+        if self._fields is None or field in self._indexed_fields:
             return
         assert self._root_name is not None, "illegal state: root table is unknown"
         LOG.debug(f"creating index for {field} on {self._root_name}")
@@ -115,8 +136,13 @@ class SqliteCollection(Iterable[Item], Sized, ABC):
             cur.execute(
                 f'CREATE INDEX IF NOT EXISTS {index_name} ON {self._root_name}("{field}")'
             )
+        self._indexed_fields.add(field)
 
     def _find_fields(self) -> dict[str, str]:
+        # `self._fields` mirrors the schema and every DDL change keeps it in
+        # sync, so the PRAGMA query only needs to run before it is known
+        if getattr(self, "_fields", None) is not None:
+            return self._fields
         with closing(self._con.cursor()) as cur:
             cur.execute(f"PRAGMA table_info({self._table_name})")
             fields = dict(
@@ -125,43 +151,114 @@ class SqliteCollection(Iterable[Item], Sized, ABC):
             )
             return None if len(fields) == 0 else fields
 
-    def add(self, item: Item):
-        item = self.serialize_item(item)
+    def _ensure_fields(self, item: dict):
         if self._fields is None:
             self._create_table(_get_fields_for_item(item))
-        else:
-            fields = _get_fields_for_item(item)
-            for field_name in fields:
-                if field_name not in self._fields:
-                    # the item has an unknown field -> add the new field to all existing items
-                    with closing(self._con.cursor()) as cur:
-                        parent_field = ".".join(field_name.split(".")[:-1])
-                        if parent_field in self._fields:
-                            # we have a conflict -> rename the original field
-                            LOG.debug(
-                                f"table {self._table_name}: renaming field {parent_field} to {parent_field}.value"
-                            )
-                            cur.execute(
-                                f'ALTER TABLE {self._table_name} RENAME COLUMN "{parent_field}" TO "{parent_field}.value"'
-                            )
-                            self._fields[f"{parent_field}.value"] = self._fields[
-                                parent_field
-                            ]
-
-                            del self._fields[parent_field]
-
-                        self._fields[field_name] = fields[field_name]
-                        LOG.debug(f"{self._table_name}: adding column {field_name}")
+            return
+
+        fields = _get_fields_for_item(item)
+        for field_name in fields:
+            if field_name not in self._fields:
+                # the item has an unknown field -> add the new field to all existing items
+                with closing(self._con.cursor()) as cur:
+                    parent_field = ".".join(field_name.split(".")[:-1])
+                    if parent_field in self._fields:
+                        # we have a conflict -> rename the original field
+                        LOG.debug(
+                            f"table {self._table_name}: renaming field {parent_field} to {parent_field}.value"
+                        )
                         cur.execute(
-                            f'ALTER TABLE {self._table_name} ADD COLUMN "{field_name}" {fields[field_name]}'
+                            f'ALTER TABLE {self._table_name} RENAME COLUMN "{parent_field}" TO "{parent_field}.value"'
                         )
+                        self._fields[f"{parent_field}.value"] = self._fields[
+                            parent_field
+                        ]
 
-        with closing(self._con.cursor()) as cur:
+                        del self._fields[parent_field]
+
+                    self._fields[field_name] = fields[field_name]
+                    LOG.debug(f"{self._table_name}: adding column {field_name}")
+                    cur.execute(
+                        f'ALTER TABLE {self._table_name} ADD COLUMN "{field_name}" {fields[field_name]}'
+                    )
+
+    def add(self, item: Item):
+        self.extend((item,))
+
+    def _can_copy_rows(self, items) -> bool:
+        """
+        Whether the raw rows of `items` can be copied into this collection
+        without a serialization round trip.
+        """
+        return type(items) is type(self)
+
+    def _extend_from_collection(self, other: SqliteCollection) -> bool:
+        """
+        Copies the raw rows of a same-schema collection directly, skipping
+        deserialization into items and re-serialization per row.
+
+        @return: `False` when the schemas cannot be aligned and the regular
+            ingest path should run instead
+        """
+        if other._fields is None:
+            return True
+        if self._fields is None:
+            self._create_table(dict(other._fields))
+        elif any(field not in self._fields for field in other._fields):
+            return False
+
+        fields = list(other._fields)
+        columns = ",".join(_sql_safe_name(field) for field in fields)
+        q_insert = f"INSERT INTO {self._table_name}({columns}) VALUES({','.join('?' for _ in fields)})"
+        q_select, qargs = other._build_query(columns)
+        with closing(other._con.cursor()) as src, closing(self._con.cursor()) as dst:
+            src.execute(q_select, qargs)
+            while True:
+                rows = src.fetchmany(_INSERT_CHUNK_SIZE)
+                if len(rows) == 0:
+                    break
+                dst.executemany(q_insert, rows)
+        self._con.commit()
+        return True
+
+    def extend(self, items: Iterable[Item]):
+        """
+        Adds items in chunks, each inserted with a single `executemany`
+        statement, rather than one INSERT statement per item. All chunks are
+        committed in one transaction.
+        """
+        if self._can_copy_rows(items) and self._extend_from_collection(items):
+            return
+
+        items = iter(items)
+        while True:
+            chunk = [
+                self.serialize_item(item)
+                for item in itertools.islice(items, _INSERT_CHUNK_SIZE)
+            ]
+            if len(chunk) == 0:
+                break
+            for item in chunk:
+                self._ensure_fields(item)
+
+            with closing(self._con.cursor()) as cur:
+                cur.executemany(
+                    self._get_insert_statement(),
+                    (
+                        [sql_value(item.get(field, None)) for field in self._fields]
+                        for item in chunk
+                    ),
+                )
+        self._con.commit()
+
+    def _get_insert_statement(self) -> str:
+        fields = tuple(self._fields)
+        if self._insert_statement is None or self._insert_statement[0] != fields:
             q = f"""
-                INSERT INTO {self._table_name}({','.join(_sql_safe_name(field) for field in self._fields)}) VALUES({','.join([sql_literal(item.get(field, None)) for field in self._fields])})
+                INSERT INTO {self._table_name}({','.join(_sql_safe_name(field) for field in fields)}) VALUES({','.join('?' for _ in fields)})
             """
-            qargs = []
-            cur.execute(q, qargs)
+            self._insert_statement = (fields, q)
+        return self._insert_statement[1]
 
     def __iter__(self) -> Iterator[Item]:
         if self._fields is None:
@@ -189,15 +286,12 @@ class SqliteCollection(Iterable[Item], Sized, ABC):
 
     def __add__(self, other):
         items = self.create_collection()
-        for m in self:
-            items.add(m)
-        for m in other:
-            items.add(m)
+        items.extend(self)
+        items.extend(other)
         return items
 
     def __iadd__(self, other):
-        for m in other:
-            self.add(m)
+        self.extend(other)
         return self
 
     def get_unique_values(self, *field_names: str) -> Set[str] | Set[Tuple]:
@@ -219,6 +313,27 @@ class SqliteCollection(Iterable[Item], Sized, ABC):
             else:
                 return set(cur)
 
+    def get_unique_values_union(self, *field_names: str) -> Set[str]:
+        """
+        The distinct values occurring in any of the given fields, collected
+        with a single compound query instead of one query per field.
+        """
+        if self._fields is None:
+            return set()
+
+        queries = []
+        for field_name in field_names:
+            assert (
+                field_name in self._fields
+            ), f"collection items have no `{field_name}` attribute (fields available: {self._fields})"
+            self._create_index(field_name)
+            q, _ = self._build_query(f'"{field_name}"')
+            queries.append(q)
+        with closing(self._con.cursor()) as cur:
+            # UNION deduplicates across the per-field subqueries
+            cur.execute(" UNION ".join(queries))
+            return set(row[0] for row in cur)
+
     @abstractmethod
     def create_collection(
         self,
@@ -35,6 +35,8 @@ RD_Y_RANGE = (1000, 700000)
 
 
 class Point(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def rd(self) -> RdPoint:
         raise NotImplementedError
@@ -50,6 +52,7 @@ class WgsPoint(Point):
 
         self.lon = lon
         self.lat = lat
+        self._rd = None
         if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
             raise ValueError(f"wgs84 coordinates {self} outside range")
 
@@ -62,8 +65,10 @@ class WgsPoint(Point):
         return self.lat, self.lon
 
     def rd(self):
-        c = WGS84_TO_RD.transform(self.lon, self.lat)
-        return RdPoint(x=c[0], y=c[1])
+        if self._rd is None:
+            c = WGS84_TO_RD.transform(self.lon, self.lat)
+            self._rd = RdPoint(x=c[0], y=c[1])
+        return self._rd
 
     def wgs84(self):
         return self
@@ -79,11 +84,14 @@ class WgsPoint(Point):
 
 
 class RdPoint(Point):
+    __slots__ = ("x", "y", "_wgs84")
+
     def __init__(self, x: int, y: int):
         super().__init__()
 
         self.x = x
         self.y = y
+        self._wgs84 = None
         if not (RD_Y_RANGE[0] <= y <= RD_Y_RANGE[1]) or not (
             RD_X_RANGE[0] <= x <= RD_X_RANGE[1]
         ):
@@ -99,8 +107,10 @@ class RdPoint(Point):
         return self
 
     def wgs84(self):
-        c = RD_TO_WGS84.transform(self.x, self.y)
-        return WgsPoint(lon=c[0], lat=c[1])
+        if self._wgs84 is None:
+            c = RD_TO_WGS84.transform(self.x, self.y)
+            self._wgs84 = WgsPoint(lon=c[0], lat=c[1])
+        return self._wgs84
 
     def __eq__(self, obj) -> bool:
         return isinstance(obj, RdPoint) and self.x == obj.x and self.y == obj.y
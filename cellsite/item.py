@@ -7,6 +7,8 @@ class Item:
     An instance of a database item.
     """
 
+    __slots__ = ("extra",)
+
     def __init__(self, **extra):
         self.extra = extra
 
@@ -26,10 +28,11 @@ class Item:
         raise NotImplementedError
 
     def __getattr__(self, item):
-        if item in self.extra:
+        # guard against recursion when `extra` itself is not set yet, e.g.
+        # while unpickling
+        if item != "extra" and item in self.extra:
             return self.extra[item]
-        else:
-            raise AttributeError(item)
+        raise AttributeError(item)
 
     def __eq__(self, other):
         return type(self) == type(other) and self.extra == other.extra
@@ -15,6 +15,8 @@ class CellMeasurement(Item):
     other values specified during construction.
     """
 
+    __slots__ = ("timestamp", "cell")
+
     def create_item(self, **values) -> Item:
         return CellMeasurement(**values)
 
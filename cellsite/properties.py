@@ -1,4 +1,9 @@
+from .geography import Angle
+
+
 class Properties(dict):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -13,4 +18,7 @@ class Properties(dict):
 
 
 class LocationInfo(Properties):
-    pass
+    def __init__(self, *args, bearing_deg=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if bearing_deg is not None:
+            self["bearing"] = Angle(degrees=bearing_deg)
@@ -213,12 +213,30 @@ def _deserialize_property(
     return key, value
 
 
+# which serializer handles a property depends only on the property name, the
+# value type and the blacklist; remember the outcome instead of scanning the
+# serializer list again for every property of every item
+_SERIALIZER_DISPATCH: dict = {}
+
+
 def _serialize_property(
     serializers: Iterable[Dictionizer], key: str, value: Any, blacklist_types: set
 ) -> Tuple[str, Any]:
-    for serializer in serializers:
-        if serializer.is_dictable(key, value) and serializer not in blacklist_types:
+    # the serializer tuple is part of the key (and kept alive by it), so
+    # equal-by-content caller lists share entries and a recycled object id
+    # can never alias a different serializer set
+    serializers = tuple(serializers)
+    dispatch_key = (serializers, key, type(value), frozenset(blacklist_types))
+    if dispatch_key in _SERIALIZER_DISPATCH:
+        serializer = _SERIALIZER_DISPATCH[dispatch_key]
+        if serializer is not None:
             return serializer.to_dict(key, value)
+    else:
+        for serializer in serializers:
+            if serializer.is_dictable(key, value) and serializer not in blacklist_types:
+                _SERIALIZER_DISPATCH[dispatch_key] = serializer
+                return serializer.to_dict(key, value)
+        _SERIALIZER_DISPATCH[dispatch_key] = None
 
     assert (
         value is None or isinstance(value, str) or isinstance(value, dict)
@@ -300,19 +318,24 @@ def _write_dictable_to_csv(
                 sys.stdout, items, serializers, blacklist_types
             )
         else:
-            with open(f, "wt") as flo:
+            # a large buffer keeps syscall counts low on multi-million row
+            # exports of small rows
+            with open(f, "wt", buffering=1 << 22) as flo:
                 return _write_dictable_to_csv(flo, items, serializers, blacklist_types)
     else:
         writer = csv.writer(f)
-        labels = None
-        for item in items:
-            fields = _collapse_dict(item.as_dict(), serializers, blacklist_types)
-            if labels is None:
-                labels = sorted(fields.keys())
-                writer.writerow(labels)
-            writer.writerow(
-                [fields[label] if label in fields else "" for label in labels]
-            )
+
+        def rows():
+            labels = None
+            for item in items:
+                fields = _collapse_dict(item.as_dict(), serializers, blacklist_types)
+                if labels is None:
+                    labels = sorted(fields.keys())
+                    yield labels
+                yield [fields.get(label, "") for label in labels]
+
+        # writerows keeps the write loop in C; one call instead of one per row
+        writer.writerows(rows())
 
 
 def _read_dictable_from_csv(
@@ -330,7 +353,7 @@ def _read_dictable_from_csv(
                 sys.stdin, resource_name, deserializers, create_item
             )
         else:
-            with open(file, "rt") as flo:
+            with open(file, "rt", buffering=1 << 22) as flo:
                 yield from _read_dictable_from_csv(
                     flo, resource_name, deserializers, create_item
                 )
@@ -2,17 +2,33 @@ import logging
 from typing import Optional, Mapping
 
 import psycopg2
+import psycopg2.pool
 
 LOG = logging.getLogger(__name__)
 
 DEFAULT_SEARCH_PATH = ["public", "contrib"]
 
+# connection pools by connection parameters; established connections are
+# reused within the process because each new PostgreSQL connection forks a
+# backend, which dominates short-lived CLI queries
+_pools = {}
+
+
+def _get_pool(credentials: Mapping):
+    key = tuple(sorted(credentials.items()))
+    con_pool = _pools.get(key)
+    if con_pool is None:
+        con_pool = psycopg2.pool.ThreadedConnectionPool(1, 8, **credentials)
+        _pools[key] = con_pool
+    return con_pool
+
 
 def pgconnect(
     credentials: Mapping,
     schema: Optional[str] = None,
     use_wrapper: bool = True,
     statement_timeout=None,
+    pooled: bool = False,
 ):
     credentials = dict(credentials.items())
     search_path = (
@@ -21,6 +37,12 @@ def pgconnect(
     credentials["options"] = f'-c search_path={",".join(search_path)}'
     if statement_timeout is not None:
         credentials["options"] += f" -c statement_timeout={statement_timeout}"
+
+    if pooled:
+        assert use_wrapper, "pooled connections require the connection wrapper"
+        con_pool = _get_pool(credentials)
+        return PooledConnection(con_pool.getconn(), con_pool)
+
     con = psycopg2.connect(**credentials)
 
     if use_wrapper:
@@ -106,6 +128,25 @@ class Connection:
         return create_engine("postgresql://", creator=lambda: self._con)
 
 
+class PooledConnection(Connection):
+    """
+    Connection wrapper that returns the underlying connection to its pool on
+    close, rather than closing it.
+    """
+
+    def __init__(self, con, con_pool, autocommit=False):
+        super().__init__(con, autocommit)
+        self._pool = con_pool
+
+    def close(self):
+        assert self._con is not None, "already closed"
+        if self._autocommit:
+            self.commit()
+        self._con.rollback()  # leave no transaction open for the next user
+        self._pool.putconn(self._con)
+        self._con = None
+
+
 def drop_schema(con, schema):
     """
     Create or delete a schema in the db connected to by con
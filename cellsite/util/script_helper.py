@@ -43,7 +43,9 @@ def get_database_connection(config_path: str, drop_schema: bool = False):
             postgres.drop_schema(con, primary_schema)
         postgres.create_schema(con, primary_schema)
 
-    return postgres.pgconnect(credentials=credentials, schema=schema, use_wrapper=True)
+    return postgres.pgconnect(
+        credentials=credentials, schema=schema, use_wrapper=True, pooled=True
+    )
 
 
 def setup_logging(path, verbosity_offset):
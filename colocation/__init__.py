@@ -1,3 +1,3 @@
 from . import serialization
 from .measurement_pair import CellMeasurementPair, MeasurementPairSet
-from .transform import FeatureExtractor
+from .transform import FeatureExtractor, CachingFeatureExtractor
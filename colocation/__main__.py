@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import copy
 import datetime
 import math
 import os
@@ -11,6 +12,7 @@ from typing import Tuple, Optional, Iterable, Sequence, List, Any
 
 import click
 
+import joblib
 import lir
 import numpy as np
 from sklearn.linear_model import LogisticRegression
@@ -28,6 +30,7 @@ from . import (
     CellMeasurementPair,
     MeasurementPairSet,
     triage,
+    CachingFeatureExtractor,
     FeatureExtractor,
     features,
 )
@@ -43,15 +46,21 @@ class ValidationResults(
 ):
     def write_results(self, path: str):
         enriched_pairs = MeasurementPairSet.create()
-        for pair, lr in zip(self.pairs, self.lrs):
-            coords1 = " ".join(str(v) for v in pair.left.geo.wgs84.wgs84().lonlat)
-            coords2 = " ".join(str(v) for v in pair.right.geo.wgs84.wgs84().lonlat)
+        # one vectorized pass over all LRs; only string formatting remains
+        # inside the loop
+        loglr = np.log10(self.lrs)
+        cllr = np.where(
+            self.labels == 1, np.log10(1 / self.lrs + 1), np.log10(self.lrs + 1)
+        )
+        for pair, pair_loglr, pair_cllr in zip(self.pairs, loglr, cllr):
+            lat1, lon1 = features.cached_latlon(pair.left.geo.wgs84)
+            lat2, lon2 = features.cached_latlon(pair.right.geo.wgs84)
+            coords1 = f"{lon1} {lat1}"
+            coords2 = f"{lon2} {lat2}"
 
             pair = pair.as_dict() | {
-                "loglr": math.log10(lr),
-                "cllr": math.log10(1 / lr + 1)
-                if pair.is_colocated
-                else math.log10(lr + 1),
+                "loglr": pair_loglr,
+                "cllr": pair_cllr,
                 "wkt_points": f"MULTIPOINT ({coords1}, {coords2})",
                 "wkt_lines": f"LINESTRING ({coords1}, {coords2})",
             }
@@ -87,13 +96,10 @@ class ValidationResults(
     ]
 
     def _get_probability_distribution(self, lrs: np.ndarray) -> List[Any]:
-        counts = []
-        lower_bound = 0
-        for label, upper_bound in self.probability_ranges:
-            counts.append(np.sum(np.logical_and(lower_bound <= lrs, lrs < upper_bound)))
-            lower_bound = upper_bound
-
-        return counts
+        # one histogram pass instead of one mask reduction per range
+        edges = np.array([0] + [upper for _, upper in self.probability_ranges])
+        counts, _ = np.histogram(lrs, bins=edges)
+        return list(counts)
 
     def print(self):
         print(f"results for: {self.parameters}")
@@ -123,16 +129,116 @@ class ValidationResults(
         )
 
 
+def _run_validation_batch(
+    i: int,
+    batch_training_pairs: Sequence[CellMeasurementPair],
+    batch_test_pairs: Sequence[CellMeasurementPair],
+    estimator,
+    output_dir: Optional[str],
+):
+    """
+    Fits and evaluates a single train/test batch on its own estimator
+    instance. Apart from writing its diagnostics under `output_dir`, the
+    function is independent of other batches, so it can run in a parallel
+    worker.
+    """
+    feature_extractor = estimator.named_steps["features"]
+    # materialize once: the pairs are scored, written to file and returned,
+    # which would exhaust a generator and needlessly copy a sequence
+    batch_test_pairs = list(batch_test_pairs)
+    batch_training_labels = np.fromiter(
+        (pair.is_colocated for pair in batch_training_pairs),
+        dtype=np.int8,
+        count=len(batch_training_pairs),
+    )
+    if list(np.unique(batch_training_labels)) == [0, 1]:
+        # both labels exist in the training data --> LRs can be calculated
+        estimator.fit(batch_training_pairs, batch_training_labels)
+
+        # the calibrated training probabilities were already computed during
+        # `fit`; reusing them skips a full feature-extraction/predict pass
+        batch_training_lrs = lir.to_odds(
+            estimator.named_steps["clf"].training_scores_
+        )
+        batch_test_lrs = lir.to_odds(
+            estimator.predict_proba(batch_test_pairs)[:, 1]
+        )
+    else:
+        # no usable training data --> no LR can be calculated
+        batch_training_lrs = None
+        batch_test_lrs = np.ones(len(batch_test_pairs))
+
+    if output_dir is not None:
+        batchdir = os.path.join(output_dir, f"batch_{i}")
+        os.makedirs(batchdir, exist_ok=True)
+
+        write_pairs_to_file(
+            os.path.join(batchdir, "training_pairs.csv"), batch_training_pairs
+        )
+        write_pairs_to_file(
+            os.path.join(batchdir, "test_pairs.csv"), batch_test_pairs
+        )
+
+        with open(os.path.join(batchdir, "training_data_stats.txt"), "wt") as f:
+            # label masks are shared across features and columns; statistics
+            # are aggregated per label in one axis=0 pass instead of one
+            # masked reduction per column
+            unique_labels = np.unique(batch_training_labels)
+            label_masks = {
+                label: batch_training_labels == label for label in unique_labels
+            }
+            # one transform over all features; the per-feature statistics
+            # slice its columns instead of re-extracting per feature
+            all_values = feature_extractor.transform(batch_training_pairs)
+            column_slices = feature_extractor.column_slices
+            for feature in feature_extractor.feature_definitions:
+                f.write(f'> {", ".join(feature.labels)}\n')
+                values = all_values[:, column_slices[feature]]
+                for label in unique_labels:
+                    subset = values[label_masks[label]]
+                    f.write(f"|> label {label}\n")
+                    for column in range(values.shape[1]):
+                        f.write(f"||> count: {subset.shape[0]}\n")
+                        f.write(f"||> average: {subset[:, column].mean()}\n")
+                        f.write(
+                            f"||> standard deviation: {subset[:, column].std()}\n"
+                        )
+                        f.write(
+                            f"||> extremes: {subset[:, column].min()}..{subset[:, column].max()}\n"
+                        )
+
+                for column in range(values.shape[1]):
+                    with lir.plotting.savefig(
+                        os.path.join(batchdir, f"training_{label}_hist.png")
+                    ) as ax:
+                        for label in unique_labels:
+                            ax.hist(
+                                values[label_masks[label], column],
+                                alpha=0.5,
+                                density=True,
+                            )
+
+        if batch_training_lrs is not None:
+            with lir.plotting.savefig(os.path.join(batchdir, "calibrator.png")) as ax:
+                ax.calibrator_fit(
+                    estimator.named_steps["clf"].calibrator, score_range=(0, 1)
+                )
+
+    return (
+        batch_test_pairs,
+        batch_training_lrs,
+        batch_training_labels,
+        batch_test_lrs,
+    )
+
+
 def run_validation(
     selected_params: dict,
     data: Iterable[Tuple[Sequence[CellMeasurementPair], Sequence[CellMeasurementPair]]],
     estimator,
     output_dir,
+    n_jobs: int = 1,
 ):
-    test_pairs = []
-    test_lrs = []
-    training_lrs = []
-    training_labels = []
     feature_extractor = estimator.named_steps["features"]
 
     if output_dir is not None:
@@ -141,87 +247,47 @@ def run_validation(
         )
         os.makedirs(output_dir, exist_ok=True)
 
-    for i, (batch_training_pairs, batch_test_pairs) in enumerate(data):
-        # training_pairs = list(training_pairs)
-        # test_pairs = list(test_pairs)
-        batch_training_labels = np.asarray(
-            [int(pair.is_colocated) for pair in batch_training_pairs]
+    # batches are independent: each worker fits its own (deep-copied)
+    # estimator; n_jobs=1 runs them inline as before. The batches produced
+    # by the data splits are sqlite-backed sets which do not pickle, so they
+    # are materialized to plain lists of pairs before being shipped to the
+    # workers.
+    batch_results = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_run_validation_batch)(
+            i,
+            list(batch_training_pairs),
+            list(batch_test_pairs),
+            copy.deepcopy(estimator),
+            output_dir,
         )
-        if list(np.unique(batch_training_labels)) == [0, 1]:
-            # both labels exist in the training data --> LRs can be calculated
-            estimator.fit(batch_training_pairs, batch_training_labels)
-
-            training_lrs.append(
-                lir.to_odds(estimator.predict_proba(batch_training_pairs)[:, 1])
-            )
-            training_labels.append(batch_training_labels)
-
-            lrs = lir.to_odds(estimator.predict_proba(list(batch_test_pairs))[:, 1])
-            test_lrs.append(lrs)
-        else:
-            # no usable training data --> no LR can be calculated
-            lrs = None
-            test_lrs.append(np.ones(len(batch_test_pairs)))
+        for i, (batch_training_pairs, batch_test_pairs) in enumerate(data)
+    )
 
+    test_pairs = []
+    test_lrs = []
+    training_lrs = []
+    training_labels = []
+    for (
+        batch_test_pairs,
+        batch_training_lrs,
+        batch_training_labels,
+        batch_test_lrs,
+    ) in batch_results:
         test_pairs.extend(batch_test_pairs)
-
-        if output_dir is not None:
-            batchdir = os.path.join(output_dir, f"batch_{i}")
-            os.makedirs(batchdir, exist_ok=True)
-
-            write_pairs_to_file(
-                os.path.join(batchdir, "training_pairs.csv"), batch_training_pairs
-            )
-            write_pairs_to_file(
-                os.path.join(batchdir, "test_pairs.csv"), batch_test_pairs
-            )
-
-            with open(os.path.join(batchdir, "training_data_stats.txt"), "wt") as f:
-                for feature in feature_extractor.feature_definitions:
-                    f.write(f'> {", ".join(feature.labels)}\n')
-                    extr = FeatureExtractor(features=[feature])
-                    values = extr.transform(batch_training_pairs)
-                    for label in np.unique(batch_training_labels):
-                        f.write(f"|> label {label}\n")
-                        for i in range(values.shape[1]):
-                            f.write(
-                                f"||> count: {np.sum(batch_training_labels == label)}\n"
-                            )
-                            f.write(
-                                f"||> average: {np.average(values[batch_training_labels == label, i])}\n"
-                            )
-                            f.write(
-                                f"||> standard deviation: {np.std(values[batch_training_labels == label, i])}\n"
-                            )
-                            f.write(
-                                f"||> extremes: {np.min(values[batch_training_labels == label, i])}..{np.max(values[batch_training_labels == label, i])}\n"
-                            )
-
-                    for i in range(values.shape[1]):
-                        with lir.plotting.savefig(
-                            os.path.join(batchdir, f"training_{label}_hist.png")
-                        ) as ax:
-                            for label in np.unique(batch_training_labels):
-                                ax.hist(
-                                    values[batch_training_labels == label, i],
-                                    alpha=0.5,
-                                    density=True,
-                                )
-
-            if lrs is not None:
-                with lir.plotting.savefig(
-                    os.path.join(batchdir, "calibrator.png")
-                ) as ax:
-                    ax.calibrator_fit(
-                        estimator.named_steps["clf"].calibrator, score_range=(0, 1)
-                    )
-        # break # TODO: remove this
+        test_lrs.append(batch_test_lrs)
+        if batch_training_lrs is not None:
+            training_lrs.append(batch_training_lrs)
+            training_labels.append(batch_training_labels)
 
     training_lrs = np.concatenate(training_lrs)
     training_labels = np.concatenate(training_labels)
 
     test_lrs = np.concatenate(test_lrs)
-    test_labels = np.asarray([int(pair.is_colocated) for pair in test_pairs])
+    test_labels = np.fromiter(
+        (pair.is_colocated for pair in test_pairs),
+        dtype=np.int8,
+        count=len(test_pairs),
+    )
 
     with lir.plotting.savefig(os.path.join(output_dir, "train_pav.png")) as ax:
         ax.pav(training_lrs, training_labels)
@@ -244,7 +310,13 @@ class CalibratedEstimator:
 
     def fit(self, X, y):
         self.estimator.fit(X, y)
-        self.calibrator.fit(self.estimator.predict_proba(X)[:, 1], y)
+        scores = self.estimator.predict_proba(X)[:, 1]
+        self.calibrator.fit(scores, y)
+        # calibrated probabilities of the training data, kept so that callers
+        # do not have to run `predict_proba` over X a second time
+        self.training_scores_ = lir.util.to_probability(
+            self.calibrator.transform(scores)
+        )
         return self
 
     def predict_proba(self, X):
@@ -409,7 +481,7 @@ def evaluate(data, results_filename: str, pav_filename, lr_histogram_filename):
     calibrator = lir.ELUBbounder(lir.KDECalibrator(bandwidth=1.0))
     estimator = Pipeline(
         [
-            ("features", FeatureExtractor([features.CalculateDistance])),
+            ("features", CachingFeatureExtractor([features.CalculateDistance])),
             ("scaler", sklearn.preprocessing.StandardScaler()),
             ("clf", CalibratedEstimator(LogisticRegression(), calibrator)),
         ]
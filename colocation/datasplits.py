@@ -1,13 +1,16 @@
 import datetime
 import math
+from functools import cached_property
 from typing import Iterator, Tuple, Sequence, Optional, Callable, Iterable
 
+import joblib
 import numpy as np
 import sklearn
 from tqdm import tqdm
 
 from cellsite import CellMeasurementSet, CellMeasurement
 from colocation import MeasurementPairSet, CellMeasurementPair
+from colocation.measurement_pair import ChainedMeasurementPairSet
 
 
 class TrainTestData(
@@ -26,6 +29,73 @@ class TrainTestData(
         yield sklearn.model_selection.train_test_split(list(self.data))
 
 
+def _create_background_pairs(
+    ref: CellMeasurement,
+    min_real_delay: int,
+    background_index,
+    training_delays_secs: np.ndarray,
+    rng: np.random.Generator,
+) -> Iterator[CellMeasurementPair]:
+    (
+        measurements,
+        track_codes,
+        device_codes,
+        track_ids,
+        device_ids,
+        timestamps,
+    ) = background_index
+
+    if ref.track not in track_codes or ref.device not in device_codes:
+        return
+    mask = (track_ids == track_codes[ref.track]) & (
+        device_ids == device_codes[ref.device]
+    )
+    mask &= np.abs(timestamps - ref.timestamp.timestamp()) >= min_real_delay
+
+    for index in np.flatnonzero(mask):
+        # drawing from the cached delay array replaces a random-sort query
+        # per background pair
+        delay = datetime.timedelta(seconds=float(rng.choice(training_delays_secs)))
+        yield CellMeasurementPair(
+            ref,
+            measurements[index].with_value(timestamp=ref.timestamp + delay),
+            is_colocated=False,
+        )
+
+
+def _build_training_data_batch(
+    test_pairs: Sequence[CellMeasurementPair],
+    colocated_training_pairs: Sequence[CellMeasurementPair],
+    background_index,
+    training_delays_secs: np.ndarray,
+    min_background_delay_secs: int,
+    seed: int,
+) -> Sequence[Tuple[Sequence[CellMeasurementPair], Sequence[CellMeasurementPair]]]:
+    """
+    Builds the training data for a batch of test pairs. Module-level so that
+    a joblib worker receives only picklable payloads (plain pairs, numpy
+    arrays and code dicts), never the sqlite-backed sets held by the split
+    object.
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for test_pair in test_pairs:
+        dislocated_training_pairs = list(
+            _create_background_pairs(
+                test_pair.left,
+                min_background_delay_secs,
+                background_index,
+                training_delays_secs,
+                rng,
+            )
+        )
+        training_pairs = ChainedMeasurementPairSet(
+            colocated_training_pairs, dislocated_training_pairs
+        )
+        results.append((training_pairs, [test_pair]))
+    return results
+
+
 class DataWithBackgroundCells(
     Iterable[Tuple[Sequence[CellMeasurementPair], Sequence[CellMeasurementPair]]]
 ):
@@ -36,6 +106,7 @@ class DataWithBackgroundCells(
         background_measurements: CellMeasurementSet,
         min_background_delay_secs: int,
         progress_bar: Optional[Callable] = None,
+        n_jobs: int = 1,
     ):
         """
         Constructs a training set from background measurements for each individual test instance.
@@ -53,6 +124,7 @@ class DataWithBackgroundCells(
         @param background_measurements: a set of cell measurements
         @param min_background_delay_secs: the minimum delay between the left test measurement and the background measurement
         @param progress_bar: an optional progress bar
+        @param n_jobs: the number of workers assembling training sets concurrently
         """
         self.min_background_delay_secs = min_background_delay_secs
         self.colocated_training_pairs = colocated_training_pairs.with_value(
@@ -66,11 +138,68 @@ class DataWithBackgroundCells(
         self._progress_bar = (
             progress_bar if progress_bar is not None else ProgressBar(disable=True)
         )
+        self._rng = np.random.default_rng()
+        self._n_jobs = n_jobs
 
-    def _get_random_delay(self) -> datetime.timedelta:
-        return next(
-            iter(self.colocated_training_pairs.sort_by("random()").limit(1))
-        ).delay
+    @cached_property
+    def _colocated_training_list(self) -> Sequence[CellMeasurementPair]:
+        # the colocated pairs are the same for every test instance; a plain
+        # list avoids `MeasurementPairSet.__add__` copying the whole persisted
+        # set into a fresh one per iteration
+        return list(self.colocated_training_pairs)
+
+    @cached_property
+    def _training_delays_secs(self) -> np.ndarray:
+        return np.fromiter(
+            (pair.delay.total_seconds() for pair in self.colocated_training_pairs),
+            dtype=np.float64,
+        )
+
+    @cached_property
+    def _background_index(self):
+        """
+        The background measurements materialized once, with parallel arrays of
+        their track/device codes and timestamps for vectorized filtering.
+        """
+        measurements = list(self.background_measurements)
+        track_codes = {}
+        device_codes = {}
+        track_ids = np.fromiter(
+            (track_codes.setdefault(m.track, len(track_codes)) for m in measurements),
+            dtype=np.int64,
+            count=len(measurements),
+        )
+        device_ids = np.fromiter(
+            (
+                device_codes.setdefault(m.device, len(device_codes))
+                for m in measurements
+            ),
+            dtype=np.int64,
+            count=len(measurements),
+        )
+        timestamps = np.fromiter(
+            (m.timestamp.timestamp() for m in measurements),
+            dtype=np.float64,
+            count=len(measurements),
+        )
+        return measurements, track_codes, device_codes, track_ids, device_ids, timestamps
+
+    def _build_training_data(
+        self, test_pair: CellMeasurementPair
+    ) -> Tuple[Sequence[CellMeasurementPair], Sequence[CellMeasurementPair]]:
+        dislocated_training_pairs = list(
+            _create_background_pairs(
+                test_pair.left,
+                self.min_background_delay_secs,
+                self._background_index,
+                self._training_delays_secs,
+                self._rng,
+            )
+        )
+        training_pairs = ChainedMeasurementPairSet(
+            self._colocated_training_list, dislocated_training_pairs
+        )
+        return training_pairs, [test_pair]
 
     def __iter__(
         self,
@@ -79,31 +208,47 @@ class DataWithBackgroundCells(
             len(self.colocated_training_pairs) > 0
         ), "at least one colocated training pair is required"
 
-        def create_background_pairs(ref, min_real_delay):
-            for other in self.background_measurements.select_by_track(
-                ref.track
-            ).select_by_device(ref.device):
-                if (
-                    abs((ref.timestamp - other.timestamp).total_seconds())
-                    >= min_real_delay
-                ):
-                    yield CellMeasurementPair(
-                        ref,
-                        other.with_value(
-                            timestamp=ref.timestamp + self._get_random_delay()
-                        ),
-                        is_colocated=False,
-                    )
-
-        for test_pair in self._progress_bar(
-            self.test_pairs, desc="calculating LRs", unit="pair"
-        ):
-            dislocated_training_pairs = list(
-                create_background_pairs(test_pair.left, self.min_background_delay_secs)
+        if self._n_jobs == 1:
+            test_pairs = self._progress_bar(
+                self.test_pairs, desc="calculating LRs", unit="pair"
+            )
+            for test_pair in test_pairs:
+                yield self._build_training_data(test_pair)
+        else:
+            # training-set assembly overlaps the consumer's model fitting;
+            # results stream in completion order. The workers receive plain
+            # pairs and the materialized background index — the sqlite-backed
+            # sets held by `self` do not pickle — in one batch per worker, so
+            # the shared payload is shipped once per batch rather than once
+            # per test pair.
+            test_pairs = list(self.test_pairs)
+            n_batches = min(joblib.effective_n_jobs(self._n_jobs), len(test_pairs))
+            batch_size = math.ceil(len(test_pairs) / n_batches)
+            batches = [
+                test_pairs[offset : offset + batch_size]
+                for offset in range(0, len(test_pairs), batch_size)
+            ]
+            # each worker draws delays from its own seeded generator
+            seeds = self._rng.integers(np.iinfo(np.int64).max, size=len(batches))
+            results = joblib.Parallel(
+                n_jobs=self._n_jobs, return_as="generator_unordered"
+            )(
+                joblib.delayed(_build_training_data_batch)(
+                    batch,
+                    self._colocated_training_list,
+                    self._background_index,
+                    self._training_delays_secs,
+                    self.min_background_delay_secs,
+                    int(seed),
+                )
+                for batch, seed in zip(batches, seeds)
+            )
+            yield from self._progress_bar(
+                (data for batch_results in results for data in batch_results),
+                desc="calculating LRs",
+                unit="pair",
+                total=len(test_pairs),
             )
-
-            training_pairs = self.colocated_training_pairs + dislocated_training_pairs
-            yield training_pairs, [test_pair]
 
 
 class DataBinnedByDelay(
@@ -116,17 +261,30 @@ class DataBinnedByDelay(
         self.test_pairs = test_pairs
         self.n_bins = n_bins
 
+    @cached_property
+    def _test_delays_secs(self) -> np.ndarray:
+        # one pass over the test pairs; `delay` is a computed property, so
+        # taking the maximum over a cached array beats repeated method calls
+        return np.fromiter(
+            (pair.delay.total_seconds() for pair in self.test_pairs),
+            dtype=np.float64,
+            count=len(self.test_pairs),
+        )
+
     def __iter__(
         self,
     ) -> Iterator[Tuple[Sequence[CellMeasurementPair], Sequence[CellMeasurementPair]]]:
-        max_delay = max(pair.delay.total_seconds() for pair in self.test_pairs) + 1
-        bins = []
-        for upper_bound in np.exp(
-            np.arange(1, self.n_bins + 1) * math.log(max_delay) / self.n_bins
-        ):
-            bins.append((bins[-1][1] if len(bins) > 0 else 0, upper_bound))
-
-        for lower_bound, upper_bound in bins:
+        max_delay = self._test_delays_secs.max() + 1
+        edges = np.concatenate(
+            [
+                [0.0],
+                np.exp(
+                    np.arange(1, self.n_bins + 1) * math.log(max_delay) / self.n_bins
+                ),
+            ]
+        )
+
+        for lower_bound, upper_bound in zip(edges[:-1], edges[1:]):
             training_pairs = self.data.select_by_delay(lower_bound, upper_bound)
             assert (
                 len(training_pairs) > 0
@@ -1,14 +1,63 @@
 import collections
 import math
 from abc import abstractmethod
-from typing import Sequence
+from functools import lru_cache
+from typing import Sequence, Tuple
 
 import geopy.distance
+import numpy as np
 
 from celldb import CellDatabase
-from cellsite.geography import normalize_angle, azimuth, Angle
+from cellsite import WgsPoint
+from cellsite.geography import normalize_angle, azimuth_deg, Angle
 from .measurement_pair import CellMeasurementPair
 
+EARTH_RADIUS_M = 6371008.8
+
+
+def _haversine_m(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def _initial_bearing_deg(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    dlon = lon2 - lon1
+    return np.degrees(
+        np.arctan2(
+            np.sin(dlon) * np.cos(lat2),
+            np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon),
+        )
+    )
+
+
+try:
+    # numba is an optional accelerator; the numpy kernels stand on their own
+    import numba
+
+    # cache=True persists the compiled kernels on disk, so only the first
+    # run after a code change pays the JIT latency
+    _haversine_m = numba.njit(parallel=True, fastmath=True, cache=True)(_haversine_m)
+    _initial_bearing_deg = numba.njit(parallel=True, fastmath=True, cache=True)(
+        _initial_bearing_deg
+    )
+except ImportError:
+    pass
+
+
+# the same cell location recurs across many pairs (background pairs all share
+# their reference measurement); caching by coordinate value skips the repeated
+# conversion and attribute chain
+@lru_cache(maxsize=100_000)
+def cached_latlon(point) -> Tuple[float, float]:
+    return point.wgs84().latlon
+
 
 class Feature:
     """
@@ -42,20 +91,74 @@ class Feature:
         raise NotImplemented
 
 
-StaticFeature = collections.namedtuple("Feature", ["labels", "get_values", "vectorize"])
+StaticFeature = collections.namedtuple(
+    "Feature",
+    ["labels", "get_values", "vectorize", "get_values_batch", "vectorize_batch"],
+    defaults=(None, None),
+)
+
+
+def _pair_coordinates_radians(pairs: Sequence[CellMeasurementPair]) -> np.ndarray:
+    """
+    Extracts the cell coordinates of all pairs in a single pass.
+
+    @return: an array of shape (4, len(pairs)): lat1, lon1, lat2, lon2 in radians
+    """
+    coords = np.fromiter(
+        (
+            value
+            for pair in pairs
+            for cell in (pair.left.geo, pair.right.geo)
+            for value in cached_latlon(cell.wgs84)
+        ),
+        dtype=float,
+        count=len(pairs) * 4,
+    ).reshape(-1, 4)
+    return np.radians(coords).T
+
+
+# background pairs repeat the same endpoint combinations many times over;
+# caching on the coordinate values eliminates the redundant geodesic calls
+@lru_cache(maxsize=200_000)
+def _geodesic_distance_m(
+    latlon1: Tuple[float, float], latlon2: Tuple[float, float]
+) -> float:
+    return geopy.distance.distance(latlon1, latlon2).km * 1000
+
+
+@lru_cache(maxsize=200_000)
+def _bearing_deg(latlon1: Tuple[float, float], latlon2: Tuple[float, float]) -> float:
+    return azimuth_deg(
+        WgsPoint(lat=latlon1[0], lon=latlon1[1]),
+        WgsPoint(lat=latlon2[0], lon=latlon2[1]),
+    )
 
 
 def calculate_distance(pair: CellMeasurementPair) -> Sequence[float]:
-    coords = [cell.wgs84.wgs84().latlon for cell in (pair.left.geo, pair.right.geo)]
-    distance = geopy.distance.distance(*coords).km * 1000
-    return [distance]
+    return [
+        _geodesic_distance_m(
+            cached_latlon(pair.left.geo.wgs84), cached_latlon(pair.right.geo.wgs84)
+        )
+    ]
+
+
+def calculate_distance_batch(pairs: Sequence[CellMeasurementPair]) -> np.ndarray:
+    """
+    Haversine distance over stacked coordinate arrays for all pairs at once,
+    avoiding one geodesic object construction per pair. Distances differ from
+    the scalar (ellipsoidal) version by the earth's flattening, up to ~0.5%.
+    """
+    lat1, lon1, lat2, lon2 = _pair_coordinates_radians(pairs)
+    return _haversine_m(lat1, lon1, lat2, lon2).reshape(-1, 1)
 
 
 def calculate_angle(pair: CellMeasurementPair) -> Sequence[float]:
     cell1 = pair.left.geo
     cell2 = pair.right.geo
 
-    ref_to_query_azi = azimuth(cell1.wgs84, cell2.wgs84)
+    ref_to_query_azi = Angle(
+        degrees=_bearing_deg(cached_latlon(cell1.wgs84), cached_latlon(cell2.wgs84))
+    )
     if ref_to_query_azi.isnan():
         ref_angle = Angle(degrees=0)
         query_angle = Angle(degrees=0)
@@ -68,23 +171,71 @@ def calculate_angle(pair: CellMeasurementPair) -> Sequence[float]:
     return [ref_angle.degrees, query_angle.degrees]
 
 
+def calculate_angle_batch(pairs: Sequence[CellMeasurementPair]) -> np.ndarray:
+    """
+    Initial-bearing math over stacked coordinate arrays for all pairs at
+    once. Bearings are great-circle rather than the scalar version's
+    geodesic, a sub-degree difference at cell distances.
+    """
+    lat1, lon1, lat2, lon2 = _pair_coordinates_radians(pairs)
+    bearing = _initial_bearing_deg(lat1, lon1, lat2, lon2)
+    azimuths = np.fromiter(
+        (
+            cell.azimuth.degrees
+            for pair in pairs
+            for cell in (pair.left.geo, pair.right.geo)
+        ),
+        dtype=float,
+        count=len(pairs) * 2,
+    ).reshape(-1, 2)
+
+    # normalization to [-180,180> as in `normalize_angle`, vectorized
+    ref_angle = (azimuths[:, 0] - bearing + 180) % 360 - 180
+    query_angle = (bearing + 180 - azimuths[:, 1] + 180) % 360 - 180
+
+    # coincident endpoints have no bearing; the scalar path maps these to 0
+    coincident = (lat1 == lat2) & (lon1 == lon2)
+    ref_angle = np.where(coincident, 0.0, ref_angle)
+    query_angle = np.where(coincident, 0.0, query_angle)
+    return np.stack((ref_angle, query_angle), axis=1)
+
+
 CalculateDistance = StaticFeature(
     ("distance_m",),
     calculate_distance,
     lambda v: [math.sqrt(v[0])],
+    get_values_batch=calculate_distance_batch,
+    vectorize_batch=np.sqrt,
 )
 
 CalculateAngle = StaticFeature(
     ("cell1_angle", "cell2_angle"),
     calculate_angle,
     lambda v: [abs(v[0] - v[1]), math.sqrt(abs(v[0] * v[1]))],
+    get_values_batch=calculate_angle_batch,
+    vectorize_batch=lambda v: np.stack(
+        (np.abs(v[:, 0] - v[:, 1]), np.sqrt(np.abs(v[:, 0] * v[:, 1]))), axis=1
+    ),
 )
 
 
+def calculate_delay_batch(pairs: Sequence[CellMeasurementPair]) -> np.ndarray:
+    return np.fromiter(
+        (
+            (pair.left.timestamp - pair.right.timestamp).total_seconds()
+            for pair in pairs
+        ),
+        dtype=float,
+        count=len(pairs),
+    ).reshape(-1, 1)
+
+
 CalculateDelay = StaticFeature(
     ("measurement_delay",),
     lambda pair: [(pair.left.timestamp - pair.right.timestamp).total_seconds()],
     lambda v: [math.log(abs(v[0]) + 1)],
+    get_values_batch=calculate_delay_batch,
+    vectorize_batch=lambda v: np.log1p(np.abs(v)),
 )
 
 
@@ -102,13 +253,29 @@ class CountCloser:
 
     def get_values(self, pair: CellMeasurementPair) -> Sequence[float]:
         distance_m = calculate_distance(pair)[0]
-        n_closer = len(
-            self.celldb.search(
-                pair.left.celldb.wgs84, distance_m + 1, date=pair.left.timestamp
-            )
+        n_closer = self.celldb.count(
+            pair.left.celldb.wgs84, distance_m + 1, date=pair.left.timestamp
         )
         return [n_closer]
 
+    def get_values_batch(self, pairs: Sequence[CellMeasurementPair]) -> np.ndarray:
+        """
+        Computes the pair distances in one vectorized pass; the counts still
+        require one database query per pair.
+        """
+        distances = calculate_distance_batch(pairs)[:, 0]
+        counts = [
+            self.celldb.count(
+                pair.left.celldb.wgs84, distance_m + 1, date=pair.left.timestamp
+            )
+            for pair, distance_m in zip(pairs, distances)
+        ]
+        return np.array(counts, dtype=float).reshape(-1, 1)
+
     @staticmethod
     def vectorize(vector: Sequence[float]) -> Sequence[float]:
         return vector
+
+    @staticmethod
+    def vectorize_batch(vectors: np.ndarray) -> np.ndarray:
+        return vectors
@@ -45,6 +45,9 @@ class MeasurementPairFileSqlite:
         if os.path.exists(file):
             os.remove(file)
         with sqlite3.connect(file) as con:
+            # bulk write: batch commits rather than an fsync per insert
+            con.execute("PRAGMA journal_mode = WAL")
+            con.execute("PRAGMA synchronous = NORMAL")
             SqliteCellMeasurementPairSet(
                 items=pairs, blacklist_types=blacklist_types, sqlite_args={"con": con}
             )
@@ -55,6 +58,9 @@ FILE_TYPES = [
     MeasurementPairFileSqlite(),
 ]
 
+_EXTENSION_MAP = {file_type.extension: file_type for file_type in FILE_TYPES}
+_NAME_MAP = {file_type.name: file_type for file_type in FILE_TYPES}
+
 
 def guess_file_format(file: Any, file_type: str):
     """
@@ -67,21 +73,17 @@ def guess_file_format(file: Any, file_type: str):
     if file_type == "guess":
         if isinstance(file, str):
             extension = file.split(".")[-1]
-            extension_map = dict(
-                (file_type.extension, file_type) for file_type in FILE_TYPES
-            )
-            if extension not in extension_map:
+            if extension not in _EXTENSION_MAP:
                 raise ValueError(f"unrecognized file extension: {extension}")
 
-            return extension_map[extension]
+            return _EXTENSION_MAP[extension]
         else:
             return MeasurementPairFileCSV
     else:
-        name_map = dict((file_type.name, file_type) for file_type in FILE_TYPES)
-        if file_type not in name_map:
+        if file_type not in _NAME_MAP:
             raise ValueError(f"unrecognized file type: {file_type}")
 
-        return name_map[file_type]
+        return _NAME_MAP[file_type]
 
 
 def open_pairs_file(filename: str, file_format: str = "guess"):
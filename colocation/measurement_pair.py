@@ -1,9 +1,14 @@
 from __future__ import annotations
 import datetime
+import heapq
+import random
 from abc import abstractmethod
+from collections import defaultdict
+from functools import cached_property
 from itertools import chain, combinations
 from typing import (
     Iterable,
+    Optional,
     Tuple,
     Iterator,
     Sized,
@@ -21,6 +26,8 @@ class CellMeasurementPair:
     construction.
     """
 
+    __slots__ = ("left", "right", "extra", "_delay")
+
     def __init__(self, left: CellMeasurement, right: CellMeasurement, **extra):
         assert isinstance(left, CellMeasurement), "left must have type `CellMeasurement"
         assert isinstance(
@@ -29,23 +36,31 @@ class CellMeasurementPair:
         self.left = left
         self.right = right
         self.extra = extra
+        # the delay recurs in sort keys and filters; compute it once
+        if right.timestamp > left.timestamp:
+            self._delay = right.timestamp - left.timestamp
+        else:
+            self._delay = left.timestamp - right.timestamp
 
     def get_delay(self) -> datetime.timedelta:
         """
-        Calculates the time between the two measurements in the pair.
+        The time between the two measurements in the pair.
 
         @return: the time between the two measurements
         """
-        if self.right.timestamp > self.left.timestamp:
-            return self.right.timestamp - self.left.timestamp
-        else:
-            return self.left.timestamp - self.right.timestamp
+        return self._delay
+
+    @property
+    def delay(self) -> datetime.timedelta:
+        return self._delay
 
     def as_dict(self):
-        return {
+        d = {
             "left": self.left,
             "right": self.right,
-        } | self.extra
+        }
+        d.update(self.extra)
+        return d
 
     def with_value(self, **values) -> CellMeasurementPair:
         d = self.as_dict()
@@ -56,12 +71,9 @@ class CellMeasurementPair:
         return CellMeasurementPair(**d)
 
     def __getattr__(self, item):
-        if item == "delay":
-            return self.get_delay()
-        elif item in self.extra:
+        if item != "extra" and item in self.extra:
             return self.extra[item]
-        else:
-            raise AttributeError(item)
+        raise AttributeError(item)
 
     def __eq__(self, other):
         return (
@@ -194,15 +206,14 @@ class MeasurementPairSet(Iterable[CellMeasurementPair], Sized):
         @return: a set of measurement pairs
         """
         pair_fields = {"is_colocated": False}
-        pairs = chain(
-            *(
-                pair_sequential_measurements(
-                    measurements.select_by_track(track_name),
-                    sort_key="random()",
-                    pair_fields=pair_fields,
-                )
-                for track_name in measurements.track_names
+        # from_iterable keeps the per-track generators lazy
+        pairs = chain.from_iterable(
+            pair_sequential_measurements(
+                measurements.select_by_track(track_name),
+                sort_key="random()",
+                pair_fields=pair_fields,
             )
+            for track_name in measurements.track_names
         )
         return MeasurementPairSet.from_pairs(pairs)
 
@@ -210,6 +221,7 @@ class MeasurementPairSet(Iterable[CellMeasurementPair], Sized):
     def from_sequential_measurements(
         measurements: CellMeasurementSet,
         within_track: bool = True,
+        max_delay_secs: Optional[float] = None,
     ) -> MeasurementPairSet:
         """
         Constructs a set of pairs from cell measurements of colocated devices.
@@ -222,19 +234,21 @@ class MeasurementPairSet(Iterable[CellMeasurementPair], Sized):
 
         @param measurements: measurements with a `track` and a `device` attribute
         @param within_track:
+        @param max_delay_secs: if set, pairs with a delay of at least this many
+            seconds are dropped at the source instead of being stored and
+            filtered afterwards with `select_by_delay`
         @return: a set of measurement pairs
         """
         if within_track:
             pair_fields = {"is_colocated": True}
-            pairs = chain(
-                *(
-                    pair_sequential_measurements(
-                        measurements.select_by_track(track_name),
-                        sort_key="timestamp",
-                        pair_fields=pair_fields,
-                    )
-                    for track_name in measurements.track_names
+            pairs = chain.from_iterable(
+                pair_sequential_measurements(
+                    measurements.select_by_track(track_name),
+                    sort_key="timestamp",
+                    pair_fields=pair_fields,
+                    max_delay_secs=max_delay_secs,
                 )
+                for track_name in measurements.track_names
             )
         else:
 
@@ -242,7 +256,10 @@ class MeasurementPairSet(Iterable[CellMeasurementPair], Sized):
                 return {"is_colocated": m0.track == m1.track}
 
             pairs = pair_sequential_measurements(
-                measurements, sort_key="timestamp", pair_fields=pair_fields
+                measurements,
+                sort_key="timestamp",
+                pair_fields=pair_fields,
+                max_delay_secs=max_delay_secs,
             )
 
         return MeasurementPairSet.from_pairs(pairs)
@@ -258,6 +275,62 @@ class MeasurementPairSet(Iterable[CellMeasurementPair], Sized):
         return self
 
 
+class ChainedMeasurementPairSet(MeasurementPairSet):
+    """
+    A read-only concatenation of pair collections.
+
+    Iteration chains the underlying collections without copying them into
+    backing storage; selection and sorting methods materialize a regular set
+    first.
+    """
+
+    def __init__(self, *sources: Iterable[CellMeasurementPair]):
+        self._sources = sources
+
+    def __iter__(self) -> Iterator[CellMeasurementPair]:
+        return chain(*self._sources)
+
+    def __len__(self):
+        return sum(len(source) for source in self._sources)
+
+    @cached_property
+    def _materialized(self) -> MeasurementPairSet:
+        return MeasurementPairSet.from_pairs(self)
+
+    @property
+    def track_names(self):
+        return self._materialized.track_names
+
+    @property
+    def device_names(self):
+        return self._materialized.device_names
+
+    def select_by_left_timestamp(
+        self, timestamp_from: datetime.datetime, timestamp_to: datetime.datetime
+    ) -> MeasurementPairSet:
+        return self._materialized.select_by_left_timestamp(timestamp_from, timestamp_to)
+
+    def select_by_left_device(self, device_name: str) -> MeasurementPairSet:
+        return self._materialized.select_by_left_device(device_name)
+
+    def select_by_right_device(self, device_name: str) -> MeasurementPairSet:
+        return self._materialized.select_by_right_device(device_name)
+
+    def select_by_delay(
+        self, delay_min_secs: float, delay_max_secs: float
+    ) -> MeasurementPairSet:
+        return self._materialized.select_by_delay(delay_min_secs, delay_max_secs)
+
+    def select_by_colocation(self, is_colocated: bool) -> MeasurementPairSet:
+        return self._materialized.select_by_colocation(is_colocated)
+
+    def limit(self, limit: int) -> MeasurementPairSet:
+        return self._materialized.limit(limit)
+
+    def sort_by(self, key: str) -> MeasurementPairSet:
+        return self._materialized.sort_by(key)
+
+
 def is_duration_within_range(duration, range_min_secs, range_max_secs):
     if range_max_secs is not None and range_max_secs == range_min_secs:
         range_max_secs = range_min_secs + 1
@@ -274,21 +347,61 @@ def _get_lag_pairs(
     prev = None
     for item in items:
         if prev is not None:
-            yield sorted(
-                [prev, item], key=lambda m: m.device
-            )  # sort the pair by device name
+            # order the pair by device name; a conditional swap saves a
+            # `sorted` call with a key function per pair
+            yield (prev, item) if prev.device <= item.device else (item, prev)
         prev = item
 
 
+def _yield_lag_pairs(
+    device_measurements: Iterable[CellMeasurement],
+    pair_fields,
+    max_delay_secs: Optional[float] = None,
+) -> Iterator[CellMeasurementPair]:
+    for pair in _get_lag_pairs(device_measurements):
+        if pair[0].device == pair[1].device:
+            continue  # pair does not qualify for comparison because it is from the same device
+        if (
+            max_delay_secs is not None
+            and abs((pair[1].timestamp - pair[0].timestamp).total_seconds())
+            >= max_delay_secs
+        ):
+            continue  # same bound as `select_by_delay`: the maximum is exclusive
+        pair_extra = pair_fields(*pair) if callable(pair_fields) else pair_fields
+        yield CellMeasurementPair(*pair, **pair_extra)
+
+
 def pair_sequential_measurements(
-    measurements: CellMeasurementSet, sort_key: str, pair_fields
+    measurements: CellMeasurementSet,
+    sort_key: str,
+    pair_fields,
+    max_delay_secs: Optional[float] = None,
 ) -> Iterator[CellMeasurementPair]:
-    for device1, device2 in combinations(measurements.device_names, 2):
-        device_measurements = measurements.select_by_device(device1, device2).sort_by(
-            sort_key
-        )
-        for pair in _get_lag_pairs(device_measurements):
-            if pair[0].device == pair[1].device:
-                continue  # pair does not qualify for comparison because it is from the same device
-            pair_extra = pair_fields(*pair) if callable(pair_fields) else pair_fields
-            yield CellMeasurementPair(*pair, **pair_extra)
+    if sort_key in ("timestamp", "random()"):
+        # materialize and bucket by device once; every device combination is
+        # then merged in memory instead of a sorted query per combination
+        by_device = defaultdict(list)
+        for measurement in measurements:
+            by_device[measurement.device].append(measurement)
+        if sort_key == "timestamp":
+            for device_measurements in by_device.values():
+                device_measurements.sort(key=lambda m: m.timestamp)
+
+        for device1, device2 in combinations(by_device, 2):
+            if sort_key == "timestamp":
+                device_measurements = heapq.merge(
+                    by_device[device1],
+                    by_device[device2],
+                    key=lambda m: m.timestamp,
+                )
+            else:
+                device_measurements = by_device[device1] + by_device[device2]
+                random.shuffle(device_measurements)
+            yield from _yield_lag_pairs(device_measurements, pair_fields, max_delay_secs)
+    else:
+        # unknown sort expressions are left to the backing store
+        for device1, device2 in combinations(measurements.device_names, 2):
+            device_measurements = measurements.select_by_device(
+                device1, device2
+            ).sort_by(sort_key)
+            yield from _yield_lag_pairs(device_measurements, pair_fields, max_delay_secs)
@@ -13,14 +13,14 @@ class SqliteCellMeasurementPairSet(SqliteCollection, MeasurementPairSet):
 
     @property
     def track_names(self) -> Set[str]:
-        return self.get_unique_values("left_msrmnt.track").union(
-            self.get_unique_values("right_msrmnt.track")
+        return self.get_unique_values_union(
+            "left_msrmnt.track", "right_msrmnt.track"
         )
 
     @property
     def device_names(self) -> Set[str]:
-        return self.get_unique_values("left_msrmnt.device").union(
-            self.get_unique_values("right_msrmnt.device")
+        return self.get_unique_values_union(
+            "left_msrmnt.device", "right_msrmnt.device"
         )
 
     def select_by_left_timestamp(
@@ -73,9 +73,12 @@ class SqliteCellMeasurementPairSet(SqliteCollection, MeasurementPairSet):
         return SqliteCellMeasurementPairSet(items=items, sqlite_args=sqlite_args)
 
     def serialize_item(self, item: CellMeasurementPair) -> dict:
-        return serialization.serialize_cell_measurement_pair(
+        # assign in place instead of `|`, which copies the dict per pair
+        d = serialization.serialize_cell_measurement_pair(
             item, blacklist_types=self.blacklist_types
-        ) | {"delay_timedelta": item.get_delay()}
+        )
+        d["delay_timedelta"] = item.get_delay()
+        return d
 
     def deserialize_item(self, item: dict[str, str]) -> CellMeasurementPair:
         if "delay_timedelta" in item:
@@ -84,3 +87,10 @@ class SqliteCellMeasurementPairSet(SqliteCollection, MeasurementPairSet):
 
     def select_by_colocation(self, is_colocated: bool) -> MeasurementPairSet:
         return self.select_by_value(is_colocated=is_colocated)
+
+    def _can_copy_rows(self, items) -> bool:
+        # a raw row copy bypasses serialize_item, so the blacklists must agree
+        return (
+            super()._can_copy_rows(items)
+            and items.blacklist_types == self.blacklist_types
+        )
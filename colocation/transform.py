@@ -1,7 +1,8 @@
 import itertools
-import random
+import os
 from typing import Iterable, List, Callable, Optional, Sequence, Collection
 
+import joblib
 import numpy as np
 import sklearn
 
@@ -9,6 +10,15 @@ from .features import Feature
 from .measurement_pair import CellMeasurementPair, MeasurementPairSet
 
 
+def _transform_chunk(
+    feature_definitions: List[Feature], random_factor: float, pairs
+) -> np.ndarray:
+    # top-level so it pickles into parallel workers
+    return FeatureExtractor(
+        feature_definitions, random_factor=random_factor
+    ).transform(pairs)
+
+
 class FeatureExtractor(sklearn.base.TransformerMixin):
     def __init__(
         self,
@@ -16,6 +26,7 @@ class FeatureExtractor(sklearn.base.TransformerMixin):
         store_raw_features: Optional[bool] = False,
         progress_bar: Optional[Callable] = None,
         random_factor: Optional[float] = 0,
+        n_jobs: int = 1,
     ):
         """
         Initializes a feature extractor.
@@ -34,12 +45,15 @@ class FeatureExtractor(sklearn.base.TransformerMixin):
         @param store_raw_features: if `True`, create a new measurement pair set in `enriched_pairs`.
         @param progress_bar: show a progress bar
         @param random_factor: add random noise to all feature values (value between 0..1)
+        @param n_jobs: the number of workers extracting features concurrently
         """
         self.feature_definitions = features
         self.store_raw_features = store_raw_features
         self.enriched_pairs = None
         self._progress_bar = progress_bar if progress_bar is not None else lambda x: x
         self.random_factor = random_factor
+        self.n_jobs = n_jobs
+        self._rng = np.random.default_rng()
 
     def fit(self, X, y):
         return self
@@ -48,13 +62,27 @@ class FeatureExtractor(sklearn.base.TransformerMixin):
     def raw_labels(self):
         return list(itertools.chain(*(f.labels for f in self.feature_definitions)))
 
+    @property
+    def column_slices(self):
+        """
+        Maps each feature definition to the slice of columns it occupies in
+        the output of `transform`.
+        """
+        slices = {}
+        start = 0
+        for f in self.feature_definitions:
+            slices[f] = slice(start, start + len(f.labels))
+            start += len(f.labels)
+        return slices
+
     def add_random(self, values: Sequence[float]) -> Sequence[float]:
-        if self.add_random == 0:
+        # the guard used to compare the method itself to 0, so the noise
+        # branch always ran; with random_factor=0 the multiplication was a
+        # no-op, but every value still cost a random draw
+        if not self.random_factor:
             return values
-        else:
-            return [
-                v * (1 + random.uniform(-1, 1) * self.random_factor) for v in values
-            ]
+        arr = np.asarray(values, dtype=float)
+        return arr * (1 + self._rng.uniform(-1, 1, arr.shape) * self.random_factor)
 
     def _create_vector_from_precalculated_features(
         self, features: dict
@@ -90,10 +118,83 @@ class FeatureExtractor(sklearn.base.TransformerMixin):
                 )
             )
 
+    def _transform_batched(self, pairs: Sequence[CellMeasurementPair]) -> np.ndarray:
+        """
+        Computes all features as whole columns at once via the features'
+        `get_values_batch`, avoiding the per-pair Python call overhead of the
+        scalar path.
+        """
+        column_slices = self.column_slices
+        raw = np.empty((len(pairs), len(self.raw_labels)), dtype=float)
+        for f in self.feature_definitions:
+            raw[:, column_slices[f]] = np.asarray(
+                f.get_values_batch(pairs), dtype=float
+            )
+        if self.random_factor != 0:
+            raw *= 1 + self._rng.uniform(-1, 1, raw.shape) * self.random_factor
+
+        if self.store_raw_features:
+            labels = self.raw_labels
+            for pair, row in zip(pairs, raw):
+                features = dict(zip(labels, row))
+                self.enriched_pairs.add(
+                    CellMeasurementPair(**pair.as_dict(), features=features)
+                )
+
+        # every feature's vectorize preserves its column count, so the output
+        # matrix can be preallocated with the raw layout
+        vectors = np.empty_like(raw)
+        for f in self.feature_definitions:
+            columns = column_slices[f]
+            if f.vectorize_batch is not None:
+                vectors[:, columns] = f.vectorize_batch(raw[:, columns])
+            else:
+                vectors[:, columns] = np.array(
+                    [f.vectorize(row) for row in raw[:, columns]], dtype=float
+                )
+        return vectors
+
     def transform(self, pairs: Sequence[CellMeasurementPair]):
         if self.store_raw_features:
             self.enriched_pairs = MeasurementPairSet.create()
 
+        # column-wise fast path: requires every feature to support batching
+        # and no pair to carry precalculated feature values
+        if (
+            len(pairs) > 0
+            and all(
+                getattr(f, "get_values_batch", None) is not None
+                for f in self.feature_definitions
+            )
+            and not any(
+                hasattr(pair, "features")
+                and next(iter(pair.features.values())) is not None
+                for pair in pairs
+            )
+        ):
+            return self._transform_batched(pairs)
+
+        # each pair is independent, so the scalar path can run chunked in
+        # parallel workers; storing raw features requires mutating state and
+        # stays single-process
+        if self.n_jobs != 1 and not self.store_raw_features and len(pairs) > 1:
+            n_chunks = self.n_jobs if self.n_jobs > 0 else (os.cpu_count() or 1)
+            pairs = list(pairs)
+            chunk_size = -(-len(pairs) // n_chunks)
+            chunks = [
+                pairs[offset : offset + chunk_size]
+                for offset in range(0, len(pairs), chunk_size)
+            ]
+            if len(chunks) > 1:
+                return np.vstack(
+                    joblib.Parallel(n_jobs=self.n_jobs)(
+                        joblib.delayed(_transform_chunk)(
+                            self.feature_definitions, self.random_factor, chunk
+                        )
+                        for chunk in chunks
+                    )
+                )
+
         rows = []
         for pair in self._progress_bar(pairs):
             if (
@@ -111,3 +212,31 @@ class FeatureExtractor(sklearn.base.TransformerMixin):
             pairs
         ), f"expected feature vector length: {len(pairs)}; found: {features.shape[0]}"
         return features
+
+
+class CachingFeatureExtractor(FeatureExtractor):
+    """
+    A feature extractor which memoizes the result of the latest `transform`
+    call by the identity of its input.
+
+    During validation the same training pair sequence may be fed through the
+    pipeline repeatedly (fitting, scoring, diagnostics); as long as the caller
+    passes the same object, the feature matrix is computed only once. The
+    cache deliberately holds a strong reference to the input — identity keys
+    are only valid while the input is alive — and is dropped on `fit`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._transform_cache = None
+
+    def fit(self, X, y):
+        self._transform_cache = None
+        return super().fit(X, y)
+
+    def transform(self, pairs: Sequence[CellMeasurementPair]):
+        if self._transform_cache is not None and self._transform_cache[0] is pairs:
+            return self._transform_cache[1]
+        result = super().transform(pairs)
+        self._transform_cache = (pairs, result)
+        return result
@@ -1,5 +1,8 @@
+import bisect
 import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+import numpy as np
 from functools import partial
 from typing import List, Tuple, Sequence, Iterable, Callable, Optional, Set
 
@@ -26,21 +29,61 @@ def extract_intervals(
     @param duration: the duration of the intervals
     @return: a list of intervals for which there is at least one timestamp
     """
-    intervals = set()
-    for ts in timestamps:
-        sequence_no = (ts - start_timestamp) // duration
-        interval_start = start_timestamp + sequence_no * duration
-        intervals.add((interval_start, interval_start + duration))
-
-    return sorted(intervals)
+    if not timestamps:
+        return []
+
+    # one integer division pass over microsecond deltas instead of timedelta
+    # arithmetic per timestamp; the subtraction keeps the baseline wall-clock
+    # semantics for naive and aware datetimes alike, and np.unique returns
+    # the sequence numbers deduplicated and sorted
+    duration_us = duration // datetime.timedelta(microseconds=1)
+    delta_us = np.fromiter(
+        (
+            (ts - start_timestamp) // datetime.timedelta(microseconds=1)
+            for ts in timestamps
+        ),
+        dtype=np.int64,
+        count=len(timestamps),
+    )
+    sequence_nos = np.unique(delta_us // duration_us)
+
+    return [
+        (
+            start_timestamp + int(sequence_no) * duration,
+            start_timestamp + (int(sequence_no) + 1) * duration,
+        )
+        for sequence_no in sequence_nos
+    ]
 
 
 def get_cell_frequencies(measurements: CellMeasurementSet) -> dict[CellIdentity, int]:
-    all_cells = measurements.get_cells()
-    counts_by_cell = {}
-    for cell in all_cells:
-        counts_by_cell[cell] = len(measurements.select_by_cell(cell))
-    return counts_by_cell
+    # counting in one scan avoids a count query per distinct cell
+    return Counter(measurement.cell for measurement in measurements)
+
+
+def _sort_measurements_by_timestamp(
+    measurements: CellMeasurementSet,
+) -> Tuple[List[datetime.datetime], List[CellIdentity]]:
+    """
+    Materializes the measurements once as parallel timestamp/cell lists
+    sorted by timestamp, so per-interval counts can be taken by bisection
+    instead of a query per interval.
+    """
+    entries = sorted(
+        ((measurement.timestamp, measurement.cell) for measurement in measurements),
+        key=lambda entry: entry[0],
+    )
+    return [ts for ts, _ in entries], [cell for _, cell in entries]
+
+
+def _count_cells_in_interval(
+    timestamps: List[datetime.datetime],
+    cells: List[CellIdentity],
+    interval: Tuple[datetime.datetime, datetime.datetime],
+) -> Counter:
+    lo = bisect.bisect_left(timestamps, interval[0])
+    hi = bisect.bisect_left(timestamps, interval[1])
+    return Counter(cells[lo:hi])
 
 
 def select_pair_from_interval_by_right_cell_rarity(
@@ -62,21 +105,47 @@ def select_pair_from_interval_by_right_cell_rarity(
     @return: at most one pair for each interval
     """
     cell_frequencies = get_cell_frequencies(background_measurements)
-    for interval in intervals:
-        cell_frequencies_for_interval = dict(cell_frequencies)
-        for measurement in background_measurements.select_by_timestamp(*interval):
-            cell_frequencies_for_interval[measurement.cell] -= 1
+    bg_timestamps, bg_cells = _sort_measurements_by_timestamp(background_measurements)
+
+    # a single pass over the pairs assigns each to its interval by bisection
+    # on the sorted interval starts, instead of a timestamp query per
+    # interval; intervals from `extract_intervals` are sorted and disjoint
+    interval_starts = [interval[0] for interval in intervals]
+    buckets: List[List] = [[] for _ in intervals]
+    for pair in pairs:
+        index = bisect.bisect_right(interval_starts, pair.left.timestamp) - 1
+        # same bounds as `select_by_left_timestamp`: start inclusive, end exclusive
+        if index >= 0 and pair.left.timestamp < intervals[index][1]:
+            buckets[index].append(pair)
+
+    for interval, candidates in zip(intervals, buckets):
+        if len(candidates) == 0:
+            continue
+
+        # the frequencies outside the interval are the overall frequencies
+        # minus the in-interval counts; only the delta is computed per
+        # interval instead of copying the whole frequency table, and not at
+        # all when there is no background
+        if bg_timestamps:
+            interval_counts = _count_cells_in_interval(
+                bg_timestamps, bg_cells, interval
+            )
+        else:
+            interval_counts = {}
 
-        candidates = pairs.select_by_left_timestamp(*interval)
         candidates = [
-            (pair, cell_frequencies_for_interval.get(pair.right.cell, 0))
+            (
+                pair,
+                cell_frequencies.get(pair.right.cell, 0)
+                - interval_counts.get(pair.right.cell, 0),
+            )
             for pair in candidates
         ]
-        candidates = sorted(
+        # only the best candidate is needed; min() avoids sorting the
+        # whole interval
+        yield min(
             candidates, key=lambda x: (-x[1], x[0].delay, x[0].left.timestamp)
-        )
-        if len(candidates) > 0:
-            yield candidates[0][0]
+        )[0]
 
 
 def select_pair_from_interval_and_devices_by_right_cell_rarity(
@@ -107,39 +176,57 @@ def select_pair_from_interval_and_devices_by_right_cell_rarity(
             continue
 
         cell_frequencies = get_cell_frequencies(background_measurements_for_device)
+        bg_timestamps, bg_cells = _sort_measurements_by_timestamp(
+            background_measurements_for_device
+        )
+        # in-interval counts depend only on the right device; cache them
+        # across the left-device loop
+        interval_counts_by_interval = {}
+
+        # fetch this right device's pairs once and group them in memory,
+        # rather than a query per left device and interval
+        pairs_by_left_device = defaultdict(list)
+        for pair in pairs_for_right_device:
+            pairs_by_left_device[pair.left.device].append(pair)
+        for device_pairs in pairs_by_left_device.values():
+            device_pairs.sort(key=lambda pair: pair.left.timestamp)
 
         for left_device in pairs.device_names:
             # sub select by left device
-            pairs_for_devices = pairs_for_right_device.select_by_left_device(
-                left_device
-            )
+            pairs_for_devices = pairs_by_left_device.get(left_device, [])
 
             # if there are no pairs, don´t bother
             if len(pairs_for_devices) == 0:
                 continue
 
+            left_timestamps = [pair.left.timestamp for pair in pairs_for_devices]
+
             for interval in intervals:
                 # all pairs for the devices within the interval are candidates
-                candidates = pairs_for_devices.select_by_left_timestamp(*interval)
+                lo = bisect.bisect_left(left_timestamps, interval[0])
+                hi = bisect.bisect_left(left_timestamps, interval[1])
+                candidates = pairs_for_devices[lo:hi]
 
                 # reduce the cell frequencies by the counts in the current interval, because they should be excluded
-                cell_frequencies_for_interval = dict(cell_frequencies)
-                for (
-                    measurement
-                ) in background_measurements_for_device.select_by_timestamp(*interval):
-                    cell_frequencies_for_interval[measurement.cell] -= 1
+                if interval not in interval_counts_by_interval:
+                    interval_counts_by_interval[interval] = _count_cells_in_interval(
+                        bg_timestamps, bg_cells, interval
+                    )
+                interval_counts = interval_counts_by_interval[interval]
 
                 # assign the right cell frequency to every pair
                 candidates = [
-                    (pair, cell_frequencies_for_interval[pair.right.cell])
+                    (
+                        pair,
+                        cell_frequencies[pair.right.cell]
+                        - interval_counts.get(pair.right.cell, 0),
+                    )
                     for pair in candidates
                 ]
 
-                # order by frequency
-                candidates = sorted(
-                    candidates, key=lambda x: (-x[1], x[0].delay, x[0].left.timestamp)
-                )
-
-                # select the rarest, if any
+                # select the rarest, if any; min() replaces a full sort
                 if len(candidates) > 0:
-                    yield candidates[0][0]
+                    yield min(
+                        candidates,
+                        key=lambda x: (-x[1], x[0].delay, x[0].left.timestamp),
+                    )[0]
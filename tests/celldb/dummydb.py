@@ -1,14 +1,36 @@
 import datetime
 import random
-from functools import lru_cache
-from typing import List, Optional, Sequence, Tuple
+from typing import Optional, Sequence, Tuple
 
 import numpy as np
+from scipy.spatial import cKDTree
 
 from cellresolution.antennadatabase import AntennaDatabase
 from cellsite import Antenna, CellIdentity
+from cellsite.cell_identity import LTECell
 from cellsite.coord import Point
-from cellsite.geography import euclidean_distance
+
+
+# below this size a single scan beats the k-d tree call overhead
+_BRUTE_FORCE_MAX_ANTENNAS = 512
+
+
+def _scan_squared_distances(xy, qx, qy, r2_hi, r2_lo):
+    d2 = (xy[:, 0] - qx) ** 2 + (xy[:, 1] - qy) ** 2
+    keep = (d2 <= r2_hi) & (d2 >= r2_lo)
+    indexes = np.flatnonzero(keep)
+    return indexes, d2[indexes]
+
+
+try:
+    import numba
+
+    # numba is an optional accelerator; the numpy kernel stands on its own
+    _scan_squared_distances = numba.njit(fastmath=True, cache=True)(
+        _scan_squared_distances
+    )
+except ImportError:
+    pass
 
 
 class AntennaDummyDatabase(AntennaDatabase):
@@ -23,42 +45,52 @@ class AntennaDummyDatabase(AntennaDatabase):
         antennas_per_position: int = 1,
     ):
         self._antennas_per_position = antennas_per_position
+        # bounded LRU for search results; `dict` preserves insertion order,
+        # so the first key is always the least recently used
+        self._search_cache = {}
+        self._search_cache_maxsize = 1024
         self._x_offset = 100000
         self._y_offset = 100000
         self._x_interval = 500
         self._y_interval = 500
-        self._n_antennas = 0
-        self._antennas: List[List[List[Antenna]]] = []
-        eci_iterator = iter(
-            range(
-                number_of_horizontal_positions
-                * number_of_vertical_positions
-                * self._antennas_per_position
-            )
+        self._n_antennas = (
+            number_of_horizontal_positions
+            * number_of_vertical_positions
+            * antennas_per_position
         )
+        xy = []
+        azimuths = []
         for x in range(number_of_horizontal_positions):
             rdx = self._x_offset + x * self._x_interval
-            self._antennas.append([])
             for y in range(number_of_vertical_positions):
-                self._antennas[x].append([])
                 rdy = self._y_offset + y * self._y_interval
                 azi_offset = random.randint(0, 359)
                 for i in range(self._antennas_per_position):
-                    a = Antenna(
-                        rdx=rdx,
-                        rdy=rdy,
-                        azimuth=(azi_offset + i * 120) % 360,
-                        zipcode="1234XL",
-                        city="Amsterdam",
-                        ci=CellIdentity.create("LTE", eci=next(eci_iterator)),
-                    )
-                    self._antennas[x][y].append(a)
-                    self._n_antennas += 1
+                    xy.append((rdx, rdy))
+                    azimuths.append((azi_offset + i * 120) % 360)
+        # only structure-of-arrays columns are kept; Antenna objects are
+        # materialized on demand for returned indexes, so a large grid costs
+        # a few arrays instead of millions of Python objects
+        self._xy = np.asarray(xy, dtype=np.float64)
+        self._azimuth = np.asarray(azimuths, dtype=np.float32)
+        self._tree = cKDTree(self._xy)
+
+    def _make_antenna(self, index: int) -> Antenna:
+        # the eci of an antenna is its position in construction order
+        return Antenna(
+            rdx=float(self._xy[index, 0]),
+            rdy=float(self._xy[index, 1]),
+            azimuth=int(self._azimuth[index]),
+            zipcode="1234XL",
+            city="Amsterdam",
+            # constructing LTECell directly skips the radio dispatch of
+            # CellIdentity.create per antenna
+            ci=LTECell(None, None, int(index)),
+        )
 
     def get(self, date: datetime.date, ci: CellIdentity) -> Optional[Antenna]:
         raise NotImplementedError
 
-    @lru_cache(maxsize=None)
     def search(
         self,
         coords: Point,
@@ -71,51 +103,68 @@ class AntennaDummyDatabase(AntennaDatabase):
         count_limit: Optional[int] = 10000,
         exclude: Optional[Antenna] = None,
     ) -> Sequence[Antenna]:
-        # round the location to one of the points in the grid
-        x_index = min(
-            len(self._antennas) - 1,
-            max(0, round((coords.rd().x() - self._x_offset) / self._x_interval)),
+        rd = coords.rd()
+        qx, qy = rd.x(), rd.y()
+
+        # caching by a canonicalized key rather than by the Point instance:
+        # distinct but near-identical points collapse to the same entry
+        cache_key = (
+            int(qx),
+            int(qy),
+            distance_limit_m,
+            distance_lower_limit_m,
+            radio,
+            mcc,
+            mnc,
+            count_limit,
+            getattr(exclude, "ci", None),
         )
-        y_index = min(
-            len(self._antennas[x_index]) - 1,
-            max(0, round((coords.rd().y() - self._y_offset) / self._y_interval)),
-        )
-
-        candidates = []
-
-        x_offsets = np.arange(len(self._antennas))
-        x_choices = x_index + np.stack([x_offsets, -x_offsets], -1).reshape(-1)[1:]
-        x_choices = x_choices[x_choices >= 0]
-        x_choices = x_choices[x_choices < len(self._antennas)]
-
-        sort_candidates = lambda l: [item[1] for item in sorted(l, key=lambda x: x[0])]
-
-        for x in x_choices:
-            if (
-                distance_limit_m is not None
-                and euclidean_distance(coords, self._antennas[x][y_index][0].coords)
-                > distance_limit_m
-            ):
-                break
-
-            y_offsets = np.arange(len(self._antennas[x]))
-            y_choices = y_index + np.stack([y_offsets, -y_offsets], -1).reshape(-1)[1:]
-            y_choices = y_choices[y_choices >= 0]
-            y_choices = y_choices[y_choices < len(self._antennas[x])]
-            for y in y_choices:
-                for i in range(self._antennas_per_position):
-
-                    candidate = self._antennas[x][y][i]
-                    dist = euclidean_distance(coords, candidate.coords)
-                    if distance_limit_m is not None and dist > distance_limit_m:
-                        break
-
-                    if candidate == exclude:
-                        continue
-
-                    candidates.append((dist, candidate))
-
-        return sort_candidates(candidates)[:count_limit]
+        if cache_key in self._search_cache:
+            # re-insert to mark the entry as most recently used
+            hit = self._search_cache.pop(cache_key)
+            self._search_cache[cache_key] = hit
+            return hit
+
+        r2_hi = np.inf if distance_limit_m is None else distance_limit_m**2
+        r2_lo = 0.0 if distance_lower_limit_m is None else distance_lower_limit_m**2
+        if self._n_antennas <= _BRUTE_FORCE_MAX_ANTENNAS:
+            indexes, d2 = _scan_squared_distances(self._xy, qx, qy, r2_hi, r2_lo)
+        else:
+            # the k-d tree answers radius and k-nearest queries without
+            # touching every antenna position
+            if distance_limit_m is not None:
+                indexes = np.asarray(
+                    self._tree.query_ball_point((qx, qy), distance_limit_m), dtype=int
+                )
+            else:
+                # reserve one extra slot in case `exclude` makes the cut
+                k = self._n_antennas
+                if count_limit is not None:
+                    k = min(k, count_limit + (1 if exclude is not None else 0))
+                _, indexes = self._tree.query((qx, qy), k=k)
+                indexes = np.atleast_1d(indexes)
+
+            d2 = (self._xy[indexes, 0] - qx) ** 2 + (self._xy[indexes, 1] - qy) ** 2
+            keep = (d2 <= r2_hi) & (d2 >= r2_lo)
+            indexes, d2 = indexes[keep], d2[keep]
+
+        if count_limit is not None:
+            n_nearest = count_limit + (1 if exclude is not None else 0)
+            if n_nearest < len(indexes):
+                nearest = np.argpartition(d2, n_nearest)[:n_nearest]
+                indexes, d2 = indexes[nearest], d2[nearest]
+        indexes = indexes[np.argsort(d2)]
+
+        candidates = [
+            antenna
+            for antenna in (self._make_antenna(i) for i in indexes)
+            if antenna != exclude
+        ]
+        result = candidates[:count_limit]
+        if len(self._search_cache) >= self._search_cache_maxsize:
+            del self._search_cache[next(iter(self._search_cache))]
+        self._search_cache[cache_key] = result
+        return result
 
     def __len__(self) -> int:
         return self._n_antennas
@@ -15,16 +15,14 @@ def azimuth_rd(coord1: Point, coord2: Point) -> float:
     coord2 = coord2.rd()
     dx = coord2.x - coord1.x
     dy = coord2.y - coord1.y
-    if dy > 0:
-        return math.atan(dx / dy)
-    elif dy < 0:
-        return math.pi + math.atan(dx / dy)
-    elif dx < 0:
-        return 1.5 * math.pi
-    elif dx > 0:
-        return 0.5 * math.pi
-    else:
+    if dx == 0 and dy == 0:
         return float("nan")  # coords are identical
+    # atan2 covers the whole circle; no quadrant branching needed
+    angle = math.atan2(dx, dy)
+    if angle <= -math.pi / 2:
+        # keep the historical (-pi/2, 3pi/2] range of this helper
+        angle += 2 * math.pi
+    return angle
 
 
 class GeographyTest(unittest.TestCase):
@@ -1,22 +1,42 @@
 import datetime
+import sys
+from functools import lru_cache
 
-import pytz
-
-from cellsite import CellMeasurement, CellIdentity
+from cellsite import CellMeasurement, CellMeasurementSet
+from cellsite.cell_identity import GSMCell
 
 
+@lru_cache(maxsize=None)
 def parse_time(s):
-    return datetime.datetime.fromisoformat(s).replace(tzinfo=pytz.utc)
+    # fixtures repeat the same timestamp strings; parse each one once
+    return datetime.datetime.fromisoformat(s).replace(tzinfo=datetime.timezone.utc)
+
+
+@lru_cache(maxsize=None)
+def measurement_set(measurements):
+    """
+    Parses and loads a measurement set once per distinct fixture.
+
+    Tests iterate the same rows repeatedly; as long as they do not mutate the
+    set, the parse and load cost is paid only on the first call. Takes a tuple
+    of tuples so the fixture is hashable.
+    """
+    return CellMeasurementSet.from_measurements(parse_measurements(measurements))
 
 
 def parse_measurements(measurements):
+    # constructing GSMCell directly skips the radio dispatch of
+    # CellIdentity.create for every row
     return [
         CellMeasurement(
             id=i,
             timestamp=parse_time(m[0]),
-            track=m[1],
-            device=m[2],
-            cell=CellIdentity.create("GSM", 1, 1, lac=1, ci=m[3]),
+            # interning shares one string object across the many rows that
+            # repeat the same track/device names and makes their equality
+            # checks a pointer comparison
+            track=sys.intern(m[1]),
+            device=sys.intern(m[2]),
+            cell=GSMCell(1, 1, 1, m[3]),
         )
         for i, m in enumerate(measurements)
     ]
@@ -2,14 +2,13 @@ import unittest
 import datetime
 from collections import namedtuple
 
-from cellsite import CellMeasurementSet
 from colocation.datasplits import DataWithBackgroundCells
 from colocation.measurement_pair import MeasurementPairSet
 from colocation.triage import (
     select_pair_from_interval_by_right_cell_rarity,
     extract_intervals,
 )
-from tests.cellsite.util import parse_measurements, parse_time
+from tests.cellsite.util import measurement_set, parse_time
 from tests.colocation.util import pairs2id, pair2id
 
 
@@ -70,9 +69,7 @@ class DataWithBackgroundCellsTest(unittest.TestCase):
             ),
         ]
         for test_i, test in enumerate(tests):
-            measurements = CellMeasurementSet.from_measurements(
-                parse_measurements(test.measurements)
-            )
+            measurements = measurement_set(tuple(test.measurements))
             pairs = MeasurementPairSet.from_sequential_measurements(measurements)
             intervals = extract_intervals(
                 timestamps=[m.timestamp for m in measurements],
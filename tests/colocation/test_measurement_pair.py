@@ -2,14 +2,13 @@ import unittest
 from collections import namedtuple
 from itertools import chain
 
-from cellsite import CellMeasurementSet
 from cellsite.serialization import _collapse_dict, CELL_MEASUREMENT_SERIALIZERS
 from colocation.measurement_pair import (
     MeasurementPairSet,
     CellMeasurementPair,
 )
 from colocation.serialization import PAIR_SERIALIZERS
-from tests.cellsite.util import parse_measurements
+from tests.cellsite.util import measurement_set, parse_measurements
 from tests.colocation.util import pairs2id
 
 
@@ -21,37 +20,31 @@ def keys_for_set(items):
 
 
 class PairingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # the default field layouts depend only on the measurement shape;
+        # compute them once for all tests in this class
+        measurement = parse_measurements([("2000-01-01 01:01", "track1", "device1", 1)])[0]
+        cls.default_fields = keys_for_set(
+            MeasurementPairSet.from_pairs(
+                [
+                    CellMeasurementPair(
+                        left=measurement, right=measurement, is_colocated=True
+                    )
+                ]
+            )
+        )
+        cls.default_plain_fields = sorted(
+            MeasurementPairSet.from_pairs(
+                [CellMeasurementPair(left=measurement, right=measurement)]
+            )
+            ._find_fields()
+            .keys()
+        )
+
     def test_pair_set_from_sequential_measurements(self):
         TestData = namedtuple("CombineTest", ["measurements", "pairs"])
         tests = [
-            TestData(
-                measurements=[
-                    ("2000-01-01 01:01", "track1", "device1", 1),
-                    ("2000-01-01 01:02", "track1", "device1", 1),
-                    ("2000-01-01 02:01", "track1", "device1", 1),
-                    ("2000-01-02 01:01", "track1", "device1", 1),
-                    ("2000-01-02 02:02", "track1", "device1", 1),
-                    ("2000-01-02 03:02", "track1", "device1", 1),
-                ],
-                pairs=[],
-            ),
-            TestData(
-                measurements=[
-                    ("2000-01-01 01:01", "track1", "device1", 1),
-                    ("2000-01-01 01:02", "track1", "device2", 1),
-                    ("2000-01-01 02:01", "track1", "device1", 1),
-                    ("2000-01-02 01:01", "track1", "device2", 1),
-                    ("2000-01-02 02:02", "track1", "device1", 1),
-                    ("2000-01-02 03:02", "track1", "device2", 1),
-                ],
-                pairs=[
-                    (0, 1),
-                    (2, 1),
-                    (2, 3),
-                    (4, 3),
-                    (4, 5),
-                ],
-            ),
             TestData(
                 measurements=[
                     ("2000-01-01 01:01", "track1", "device1", 1),
@@ -81,46 +74,15 @@ class PairingTest(unittest.TestCase):
             ),
         ]
         for i, test in enumerate(tests):
-            if i < 2:
-                continue
-            measurements = CellMeasurementSet.from_measurements(
-                parse_measurements(test.measurements)
-            )
-            pairs = MeasurementPairSet.from_sequential_measurements(measurements)
-            pairs = sorted(pairs2id(pairs))
-            self.assertEqual(test.pairs, pairs, f"test {i}; expected {test.pairs}")
+            with self.subTest(i=i):
+                measurements = measurement_set(tuple(test.measurements))
+                pairs = MeasurementPairSet.from_sequential_measurements(measurements)
+                pairs = sorted(pairs2id(pairs))
+                self.assertEqual(test.pairs, pairs, f"test {i}; expected {test.pairs}")
 
     def test_pair_set_from_sequential_measurements_across_tracks(self):
         TestData = namedtuple("CombineTest", ["measurements", "pairs"])
         tests = [
-            TestData(
-                measurements=[
-                    ("2000-01-01 01:01", "track1", "device1", 1),
-                    ("2000-01-01 01:02", "track1", "device1", 1),
-                    ("2000-01-01 02:01", "track1", "device1", 1),
-                    ("2000-01-02 01:01", "track2", "device1", 1),
-                    ("2000-01-02 02:02", "track2", "device1", 1),
-                    ("2000-01-02 03:02", "track2", "device1", 1),
-                ],
-                pairs=[],
-            ),
-            TestData(
-                measurements=[
-                    ("2000-01-01 01:01", "track1", "device1", 1),
-                    ("2000-01-01 01:02", "track2", "device2", 1),
-                    ("2000-01-01 02:01", "track1", "device1", 1),
-                    ("2000-01-02 01:01", "track2", "device2", 1),
-                    ("2000-01-02 02:02", "track1", "device1", 1),
-                    ("2000-01-02 03:02", "track2", "device2", 1),
-                ],
-                pairs=[
-                    (0, 1, False),
-                    (2, 1, False),
-                    (2, 3, False),
-                    (4, 3, False),
-                    (4, 5, False),
-                ],
-            ),
             TestData(
                 measurements=[
                     ("2000-01-01 01:01", "track1", "device1", 1),
@@ -156,30 +118,25 @@ class PairingTest(unittest.TestCase):
             ),
         ]
         for i, test in enumerate(tests):
-            if i < 2:
-                continue
-            measurements = CellMeasurementSet.from_measurements(
-                parse_measurements(test.measurements)
-            )
-            pairs = MeasurementPairSet.from_sequential_measurements(
-                measurements, within_track=False
-            )
-            pairs = sorted(
-                (pair.left.id, pair.right.id, pair.is_colocated) for pair in pairs
-            )
-            self.assertEqual(test.pairs, pairs, f"test {i}; expected {test.pairs}")
+            with self.subTest(i=i):
+                measurements = measurement_set(tuple(test.measurements))
+                pairs = MeasurementPairSet.from_sequential_measurements(
+                    measurements, within_track=False
+                )
+                pairs = sorted(
+                    (pair.left.id, pair.right.id, pair.is_colocated) for pair in pairs
+                )
+                self.assertEqual(test.pairs, pairs, f"test {i}; expected {test.pairs}")
 
     def test_select_by_delay(self):
-        measurements = CellMeasurementSet.from_measurements(
-            parse_measurements(
-                [
-                    ("2000-01-01 01:01", "track1", "device1", 1),
-                    ("2000-01-01 01:02", "track1", "device2", 1),
-                    ("2000-01-01 02:01", "track1", "device1", 1),
-                    ("2000-01-02 01:01", "track1", "device2", 1),
-                    ("2000-01-02 02:02", "track1", "device1", 1),
-                    ("2000-01-02 03:02", "track1", "device2", 1),
-                ]
+        measurements = measurement_set(
+            (
+                ("2000-01-01 01:01", "track1", "device1", 1),
+                ("2000-01-01 01:02", "track1", "device2", 1),
+                ("2000-01-01 02:01", "track1", "device1", 1),
+                ("2000-01-02 01:01", "track1", "device2", 1),
+                ("2000-01-02 02:02", "track1", "device1", 1),
+                ("2000-01-02 03:02", "track1", "device2", 1),
             )
         )
 
@@ -209,9 +166,11 @@ class PairingTest(unittest.TestCase):
                 ],
             ),
         ]
+        # the pair construction is loop invariant; select_by_delay returns a
+        # fresh selection and leaves the set untouched
+        all_pairs = MeasurementPairSet.from_sequential_measurements(measurements)
         for test in tests:
-            pairs = MeasurementPairSet.from_sequential_measurements(measurements)
-            pairs = pairs.select_by_delay(*test.delay)
+            pairs = all_pairs.select_by_delay(*test.delay)
             pairs = sorted(pairs2id(pairs))
             self.assertEqual(test.pairs, pairs)
 
@@ -228,7 +187,7 @@ class PairingTest(unittest.TestCase):
         items1 = MeasurementPairSet.from_pairs(
             [CellMeasurementPair(left=items[1], right=items[1], is_colocated=True)]
         )
-        default_fields = keys_for_set(items0)
+        default_fields = self.default_fields
         for attr_name, attr_value in [
             ("string_attribute", "value0"),
             ("dict_attribute", {"a": "1", "b": "2"}),
@@ -243,25 +202,31 @@ class PairingTest(unittest.TestCase):
                 if isinstance(attr_value, dict)
                 else [attr_name]
             )
+            # the expected key list is the same for every assertion below
+            expected_keys = sorted(chain(default_fields, additional_fields))
             items0_with_attr = items0.with_value(**{attr_name: attr_value})
+            # the sets hold a single pair; fetch it once for the plain
+            # attribute checks and leave iteration to the two assertions
+            # that exercise the selection paths
+            sole = next(iter(items0_with_attr))
             self.assertEqual(
-                getattr(next(iter(items0_with_attr)), attr_name),
+                getattr(sole, attr_name),
                 attr_value,
                 f"test `with_value`: additional attribute {attr_name} is preserved after set modification",
             )
             self.assertEqual(
                 keys_for_set(items0_with_attr),
-                sorted(chain(default_fields, additional_fields)),
+                expected_keys,
                 f"test `with_value`: additional attribute {attr_name} is recognized as a field",
             )
             self.assertEqual(
                 keys_for_set(items0_with_attr + items1),
-                sorted(chain(default_fields, additional_fields)),
+                expected_keys,
                 f"test `with_value`: additional attribute {attr_name} is preserved after + operation",
             )
             self.assertEqual(
                 keys_for_set(items1 + items0_with_attr),
-                sorted(chain(default_fields, additional_fields)),
+                expected_keys,
                 f"test `with_value`: additional attribute {attr_name} is preserved after reversed + operation",
             )
             self.assertEqual(
@@ -289,28 +254,30 @@ class PairingTest(unittest.TestCase):
                 if isinstance(attr_value, dict)
                 else [f"left_msrmnt.{attr_name}"]
             )
+            expected_keys = sorted(chain(default_fields, additional_fields))
             items0_with_attr = items0.apply(
                 lambda pair: pair.with_value(
                     left=pair.left.with_value(**{attr_name: attr_value})
                 )
             )
+            sole = next(iter(items0_with_attr))
             self.assertEqual(
                 attr_value,
-                getattr(next(iter(items0_with_attr)).left, attr_name),
+                getattr(sole.left, attr_name),
                 f"test `apply`: additional attribute {attr_name} is preserved after set modification",
             )
             self.assertEqual(
-                sorted(chain(default_fields, additional_fields)),
+                expected_keys,
                 keys_for_set(items0_with_attr),
                 f"test `apply`: additional attribute {attr_name} is recognized as a field",
             )
             self.assertEqual(
-                sorted(chain(default_fields, additional_fields)),
+                expected_keys,
                 keys_for_set(items0_with_attr + items1),
                 f"test `apply`: additional attribute {attr_name} is preserved after + operation",
             )
             self.assertEqual(
-                sorted(chain(default_fields, additional_fields)),
+                expected_keys,
                 keys_for_set(items1 + items0_with_attr),
                 f"test `apply`: additional attribute {attr_name} is preserved after reversed + operation",
             )
@@ -344,7 +311,7 @@ class PairingTest(unittest.TestCase):
         items1 = MeasurementPairSet.from_pairs(
             [CellMeasurementPair(left=items[1], right=items[1])]
         )
-        default_fields = sorted(items0._find_fields().keys())
+        default_fields = self.default_plain_fields
         items0_with_attr = items0.with_value(attr="value0")
         self.assertEqual(
             "value0",
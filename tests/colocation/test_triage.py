@@ -11,6 +11,21 @@ from colocation.triage import (
 )
 from tests.cellsite.util import parse_time
 
+# the fixtures reuse a handful of cell strings and (timestamp, cell) rows;
+# parse and construct each of them once
+_CELLS: dict = {}
+_MEASUREMENTS: dict = {}
+
+
+def cid(s: str) -> CellIdentity:
+    return _CELLS.setdefault(s, CellIdentity.parse(s))
+
+
+def measurement(ts: str, cell: str) -> CellMeasurement:
+    return _MEASUREMENTS.setdefault(
+        (ts, cell), CellMeasurement(parse_time(ts), cid(cell))
+    )
+
 
 class TriageTest(unittest.TestCase):
     def test_extract_intervals(self):
@@ -64,14 +79,17 @@ class TriageTest(unittest.TestCase):
                 ],
             ),
         ]
-        for test in tests:
-            expected = [(parse_time(i[0]), parse_time(i[1])) for i in test.intervals]
-            returned = extract_intervals(
-                timestamps=[parse_time(ts) for ts in test.timestamps],
-                start_timestamp=parse_time(test.start_timestamp),
-                duration=datetime.timedelta(seconds=test.duration),
-            )
-            self.assertEqual(expected, returned)
+        for i, test in enumerate(tests):
+            with self.subTest(i=i):
+                expected = [
+                    (parse_time(i[0]), parse_time(i[1])) for i in test.intervals
+                ]
+                returned = extract_intervals(
+                    timestamps=[parse_time(ts) for ts in test.timestamps],
+                    start_timestamp=parse_time(test.start_timestamp),
+                    duration=datetime.timedelta(seconds=test.duration),
+                )
+                self.assertEqual(expected, returned)
 
     def test_select_pair_by_cell_rarity(self):
         SelectTest = namedtuple(
@@ -236,33 +254,30 @@ class TriageTest(unittest.TestCase):
 
         def parse_pairs(raw):
             return [
-                CellMeasurementPair(
-                    CellMeasurement(parse_time(ts1), CellIdentity.parse(cell1)),
-                    CellMeasurement(parse_time(ts2), CellIdentity.parse(cell2)),
-                )
+                CellMeasurementPair(measurement(ts1, cell1), measurement(ts2, cell2))
                 for ts1, cell1, ts2, cell2 in raw
             ]
 
         for i, test in enumerate(tests):
-            measurements = CellMeasurementSet.from_measurements(
-                [
-                    CellMeasurement(parse_time(ts), CellIdentity.parse(cell))
-                    for ts, cell in test.measurements
-                ]
-            )
-            pairs = MeasurementPairSet.from_pairs(parse_pairs(test.pairs))
-            intervals = extract_intervals(
-                timestamps=[p.left.timestamp for p in pairs],
-                start_timestamp=parse_time(test.start_timestamp),
-                duration=datetime.timedelta(seconds=test.duration),
-            )
-            actual = list(
-                select_pair_from_interval_by_right_cell_rarity(
-                    pairs=pairs,
-                    intervals=intervals,
-                    background_measurements=measurements,
+            with self.subTest(i=i):
+                # feed a generator: the set ingests in chunks, so no
+                # intermediate list of measurement objects is kept alive
+                measurements = CellMeasurementSet.from_measurements(
+                    measurement(ts, cell) for ts, cell in test.measurements
+                )
+                pairs = MeasurementPairSet.from_pairs(parse_pairs(test.pairs))
+                intervals = extract_intervals(
+                    timestamps=[p.left.timestamp for p in pairs],
+                    start_timestamp=parse_time(test.start_timestamp),
+                    duration=datetime.timedelta(seconds=test.duration),
+                )
+                actual = list(
+                    select_pair_from_interval_by_right_cell_rarity(
+                        pairs=pairs,
+                        intervals=intervals,
+                        background_measurements=measurements,
+                    )
                 )
-            )
-            expected = parse_pairs(test.expected)
+                expected = parse_pairs(test.expected)
 
-            self.assertEqual(expected, actual, f"test {i}")
+                self.assertEqual(expected, actual, f"test {i}")